@@ -1,6 +1,27 @@
 """Auxiliary functions for the comparative statics analysis."""
+import hashlib
+import multiprocessing as mp
+import os
+import sys
+from pathlib import Path
+
 import matplotlib.pyplot as plt
-import pandas as pd
+import numpy as np
+from matplotlib.figure import Figure
+
+sys.path.insert(0, f"{os.environ['PROJECT_ROOT']}/robustness")
+sys.path.insert(0, f"{os.environ['PROJECT_ROOT']}/python")
+
+from auxfunc_experiences import EXPERIENCE_COLUMNS
+from auxfunc_experiences import eval_mean_max_experiences
+from auxfunc_experiences import get_experience_columns
+from auxfunc_plotting import get_choice_shares
+from auxfunc_plotting import plot_choice_shares
+from panel_store import get_panel_columns
+from panel_store import read_panels
+
+# Choices of the simulated models (KW97) in the order of the stacked bars
+CHOICES = ["school", "home", "blue_collar", "white_collar", "military"]
 
 
 def ambiguity_effect_experiences(dict_model_dfs):
@@ -8,44 +29,34 @@ def ambiguity_effect_experiences(dict_model_dfs):
 
     Parameters:
     -----------
-    dict_model_dfs: dict
+    dict_model_dfs: dict or Path
         Dictionary that contains a simulated models in the format
-        key = ambiguity level, value = pd.DataFrame.
+        key = ambiguity level, value = pd.DataFrame, or the directory of a panel
+        store from which only the experience columns are read.
 
     Returns:
     --------
     summarized: pd.DataFrame
         Dataframe that summarizes the experience levels for each occupation
-        and each ambiguity level.
+        and each ambiguity level, the occupations are detected from the model.
 
     """
 
-    _df = dict_model_dfs
-    summarized = {}
+    experience_labels = {
+        column: label
+        for model_columns in EXPERIENCE_COLUMNS.values()
+        for column, label in model_columns.items()
+    }
 
-    for ak in _df.keys():
+    if isinstance(dict_model_dfs, (str, Path)):
+        experience_columns = get_experience_columns(get_panel_columns(dict_model_dfs))
+        dict_model_dfs = read_panels(dict_model_dfs, columns=experience_columns)
+    else:
+        experience_columns = None
 
-        exp_bluecol = (
-            _df[ak].groupby("Identifier")["Experience_Blue_Collar"].max().mean()
-        )
-        exp_whitecol = (
-            _df[ak].groupby("Identifier")["Experience_White_Collar"].max().mean()
-        )
-        exp_military = _df[ak].groupby("Identifier")["Experience_Military"].max().mean()
-        exp_school = _df[ak].groupby("Identifier")["Experience_School"].max().mean()
-
-        summarized[ak] = [
-            exp_bluecol,
-            exp_whitecol,
-            exp_military,
-            exp_school,
-        ]
-
-    summarized = pd.DataFrame.from_dict(summarized, orient="index").rename(
-        columns={0: "Blue", 1: "White", 2: "Military", 3: "School"}
-    )
+    summarized = eval_mean_max_experiences(dict_model_dfs, experience_columns)
 
-    return summarized
+    return summarized.rename(columns=experience_labels)
 
 
 def plot_ambiguity_effect_choiceshare(dict_selected, al_selected, filename):
@@ -53,9 +64,10 @@ def plot_ambiguity_effect_choiceshare(dict_selected, al_selected, filename):
 
     Parameters:
     -----------
-    dict_selected: dict
+    dict_selected: dict or Path
         Dictionary that contains a simulated models in the format
-        key = ambiguity level, value = pd.DataFrame.
+        key = ambiguity level, value = pd.DataFrame, or the directory of a panel
+        store from which only the choices are read.
 
     al_selected: list
         List that contains keys available in "dict_selected".
@@ -71,20 +83,40 @@ def plot_ambiguity_effect_choiceshare(dict_selected, al_selected, filename):
 
     """
 
-    fig, axs = plt.subplots(
-        1, len(al_selected), figsize=(20, 4), sharey=True, sharex=True
-    )
-    axs = axs.flatten()
-
-    for (ak, ax) in zip(al_selected, axs):
-        shares = (
-            dict_selected[ak]
-            .groupby("Period")
-            .Choice.value_counts(normalize=True)
-            .unstack()[["school", "home", "blue_collar", "white_collar", "military"]]
+    if isinstance(dict_selected, (str, Path)):
+        dict_selected = read_panels(
+            dict_selected, columns=["Choice"], ambiguity_values=al_selected
         )
 
-        shares.plot.bar(stacked=True, ax=ax, width=0.9, legend=True)
+    shares = get_choice_shares([dict_selected[ak] for ak in al_selected], CHOICES)
+
+    fig = plt.figure(figsize=(20, 4))
+    draw_ambiguity_effect_choiceshare(fig, shares, al_selected)
+    save_ambiguity_effect_choiceshare(fig, filename)
+
+
+def draw_ambiguity_effect_choiceshare(fig, shares, al_selected):
+    """Draws the choice shares of the selected ambiguity levels side by side.
+
+    Parameters:
+    -----------
+    fig: matplotlib.figure.Figure
+        Empty figure.
+
+    shares: np.ndarray
+        Choice shares of shape (levels, periods, choices), see
+        ``get_choice_shares``.
+
+    al_selected: list
+        Ambiguity levels in the order of ``shares``.
+
+    """
+
+    axs = fig.subplots(1, len(al_selected), sharey=True, sharex=True, squeeze=False)
+    axs = axs.flatten()
+
+    for ak, ax, shares_level in zip(al_selected, axs, shares):
+        plot_choice_shares(ax, shares_level, CHOICES, width=0.9)
 
         ax.set_ylim(0, 1)
         ax.set_ylabel("Share of individuals")
@@ -93,16 +125,121 @@ def plot_ambiguity_effect_choiceshare(dict_selected, al_selected, filename):
         ax.set_xticklabels(range(0, 51, 5), rotation="horizontal")
 
         handles, labels = ax.get_legend_handles_labels()
-        ax.get_legend().remove()
         ax.set_title(f"Ambiguity level: {ak}.")
 
-        _legend = fig.legend(
-            handles, labels, loc="lower center", bbox_to_anchor=(0.418, 1), ncol=5
-        )
+    fig.legend(handles, labels, loc="lower center", bbox_to_anchor=(0.418, 1), ncol=5)
+
+
+def save_ambiguity_effect_choiceshare(fig, filename):
+    """Saves a figure of choice shares as fig_choice_patterns_{filename}.pdf."""
 
     fig.savefig(
         f"fig_choice_patterns_{filename}.pdf",
-        bbox_extra_artists=(_legend,),
+        bbox_extra_artists=fig.legends,
         bbox_inches="tight",
         dpi=300,
     )
+
+
+def get_figure_hash(shares, al_selected):
+    """Hash of the inputs of a figure of choice shares."""
+    figure_hash = hashlib.sha256()
+    figure_hash.update(np.ascontiguousarray(shares).tobytes())
+    figure_hash.update(repr([str(ak) for ak in al_selected]).encode())
+    figure_hash.update(repr(CHOICES).encode())
+
+    return figure_hash.hexdigest()
+
+
+def render_ambiguity_effect_choiceshare(task):
+    """Renders a figure of choice shares unless its inputs have not changed.
+
+    Parameters:
+    -----------
+    task: tuple
+        Tuple (shares, al_selected, filename), see
+        ``plot_ambiguity_effect_choiceshares``.
+
+    Returns:
+    --------
+    is_rendered: bool
+        False if the figure has been skipped.
+
+    """
+
+    shares, al_selected, filename = task
+
+    figure_hash = get_figure_hash(shares, al_selected)
+    path_hash = Path(f"fig_choice_patterns_{filename}.sha256")
+
+    if (
+        Path(f"fig_choice_patterns_{filename}.pdf").exists()
+        and path_hash.exists()
+        and path_hash.read_text() == figure_hash
+    ):
+        return False
+
+    # Figures are created without pyplot, such that nothing is displayed and the
+    # workers do not depend on the (interactive) backend.
+    fig = Figure(figsize=(20, 4))
+    draw_ambiguity_effect_choiceshare(fig, shares, al_selected)
+    save_ambiguity_effect_choiceshare(fig, filename)
+
+    path_hash.write_text(figure_hash)
+
+    return True
+
+
+def plot_ambiguity_effect_choiceshares(dict_model_dfs, figures, num_proc=1):
+    """Renders several figures of choice shares from one batch of choice shares.
+
+    The choice shares of all required ambiguity levels are computed at once.
+    Figures whose choice shares and levels did not change since they have been
+    rendered are skipped, the remaining figures are rendered in parallel.
+
+    Parameters:
+    -----------
+    dict_model_dfs: dict or Path
+        Dictionary that contains a simulated models in the format
+        key = ambiguity level, value = pd.DataFrame, or the directory of a panel
+        store from which only the choices are read.
+
+    figures: dict
+        Dictionary in the format key = filename, value = list of ambiguity levels
+        (see ``plot_ambiguity_effect_choiceshare``).
+
+    num_proc: int
+        Number of processes.
+
+    Returns:
+    --------
+    rendered: dict
+        Dictionary in the format key = filename, value = False if the figure has
+        been skipped.
+
+    """
+
+    levels = list(
+        dict.fromkeys(ak for al_selected in figures.values() for ak in al_selected)
+    )
+
+    if isinstance(dict_model_dfs, (str, Path)):
+        dict_model_dfs = read_panels(
+            dict_model_dfs, columns=["Choice"], ambiguity_values=levels
+        )
+
+    shares = get_choice_shares([dict_model_dfs[ak] for ak in levels], CHOICES)
+    positions = {ak: num for num, ak in enumerate(levels)}
+
+    tasks = [
+        (shares[[positions[ak] for ak in al_selected]], al_selected, filename)
+        for filename, al_selected in figures.items()
+    ]
+
+    if num_proc > 1:
+        with mp.Pool(min(num_proc, len(tasks))) as pool:
+            is_rendered = pool.map(render_ambiguity_effect_choiceshare, tasks)
+    else:
+        is_rendered = [render_ambiguity_effect_choiceshare(task) for task in tasks]
+
+    return dict(zip(figures.keys(), is_rendered))
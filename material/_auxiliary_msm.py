@@ -1,5 +1,9 @@
 """Auxiliary functions for the MSM notebook."""
+import multiprocessing as mp
+
+import _moments
 import numpy as np
+import pandas as pd
 import respy as rp
 
 
@@ -37,3 +41,187 @@ def get_weighting_matrix(data, calc_moments, num_boots, num_agents_msm):
     weighting_matrix = np.diag(moments_var ** (-1))
 
     return np.nan_to_num(weighting_matrix)
+
+
+def get_weighting_matrix_batched(
+    data, calc_moments, num_boots, num_agents_msm, num_proc=1, chunksize=100
+):
+    """Compute weighting matrix for estimation with MSM from sufficient statistics.
+
+    Fast path of ``get_weighting_matrix`` for choice frequencies and the wage
+    distribution. The per-agent and per-period statistics are computed once and
+    each bootstrap replicate is a matrix product with the indicator of the drawn
+    agents. Draws are identical to ``get_weighting_matrix`` for the same seed.
+    """
+    if not set(calc_moments.values()).issubset(BATCHED_MOMENTS):
+        return get_weighting_matrix(data, calc_moments, num_boots, num_agents_msm)
+
+    # Seed for reproducibility.
+    np.random.seed(123)
+
+    index_base = data.index.get_level_values("Identifier").unique()
+
+    # Draw the same agents as get_weighting_matrix.
+    positions_boot = np.array(
+        [
+            index_base.get_indexer(
+                np.random.choice(index_base, num_agents_msm, replace=False)
+            )
+            for _ in range(num_boots)
+        ]
+    ).reshape(num_boots, num_agents_msm)
+
+    templates = [calc_moments[key](data) for key in calc_moments.keys()]
+    statistics = [
+        BATCHED_MOMENTS[calc_moments[key]][0](data, index_base, template)
+        for key, template in zip(calc_moments.keys(), templates)
+    ]
+    funcs_boot = [BATCHED_MOMENTS[calc_moments[key]][1] for key in calc_moments]
+
+    # Create bootstrapped moments in chunks of replicates.
+    chunks = [
+        (positions_chunk, statistics, funcs_boot, len(index_base))
+        for positions_chunk in np.array_split(
+            positions_boot, range(chunksize, num_boots, chunksize)
+        )
+    ]
+    if num_proc > 1:
+        with mp.Pool(min(num_proc, len(chunks))) as pool:
+            moments_chunks = pool.map(calc_moments_chunk, chunks)
+    else:
+        moments_chunks = [calc_moments_chunk(chunk) for chunk in chunks]
+    moments_boot = np.concatenate(moments_chunks)
+
+    moments_sample = order_flat_moments(moments_boot, templates)
+
+    # Compute variance for each moment and construct diagonal weighting matrix.
+    moments_var = moments_sample.var(axis=0)
+    weighting_matrix = np.diag(moments_var ** (-1))
+
+    return np.nan_to_num(weighting_matrix)
+
+
+def calc_moments_chunk(chunk):
+    """Calculate the moments of a chunk of bootstrap replicates.
+
+    Returns an array of shape (replicates, moments) with the moments of each
+    function in the row-major order of its data frame.
+    """
+    positions_boot, statistics, funcs_boot, num_agents = chunk
+
+    indicator = np.zeros((len(positions_boot), num_agents))
+    np.put_along_axis(indicator, positions_boot, 1, axis=1)
+
+    return np.hstack(
+        [func(indicator, stats) for func, stats in zip(funcs_boot, statistics)]
+    )
+
+
+def order_flat_moments(moments_boot, templates):
+    """Arrange row-major moments in the order of ``rp.get_flat_moments``.
+
+    The templates are the moments of the full data. Their cells are replaced by
+    the position of the cell, such that flattening them yields the order.
+    """
+    positions, offset = [], 0
+    for template in templates:
+        positions.append(
+            pd.DataFrame(
+                np.arange(offset, offset + template.size).reshape(template.shape),
+                index=template.index,
+                columns=template.columns,
+            ).where(template.notna())
+        )
+        offset += template.size
+
+    positions = rp.get_flat_moments(positions).to_numpy(dtype=float)
+    is_cell = ~np.isnan(positions)
+
+    moments_sample = np.full((len(moments_boot), len(positions)), np.nan)
+    moments_sample[:, is_cell] = moments_boot[:, positions[is_cell].astype(int)]
+
+    return moments_sample
+
+
+def get_choice_statistics(data, index_base, template):
+    """Number of choices of each agent per period and choice."""
+    is_categorical = isinstance(data["Choice"].dtype, pd.CategoricalDtype)
+
+    agents = index_base.get_indexer(data.index.get_level_values("Identifier"))
+    periods = template.index.get_indexer(data.index.get_level_values("Period"))
+    choices = pd.Categorical(data["Choice"], categories=template.columns).codes
+
+    is_valid = (choices >= 0) & (periods >= 0)
+    counts = np.zeros((len(index_base), template.size))
+    np.add.at(
+        counts,
+        (agents[is_valid], periods[is_valid] * template.shape[1] + choices[is_valid]),
+        1,
+    )
+
+    return counts, template.shape, is_categorical
+
+
+def calc_choice_frequencies_boot(indicator, stats):
+    """Choice frequencies of bootstrap replicates, see ``calc_choice_frequencies``."""
+    counts, shape, is_categorical = stats
+    counts_boot = (indicator @ counts).reshape(-1, *shape)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shares = counts_boot / counts_boot.sum(axis=2, keepdims=True)
+
+    # Without categories, choices that do not occur in a period are missing.
+    if not is_categorical:
+        shares[counts_boot == 0] = np.nan
+
+    return shares.reshape(len(indicator), -1)
+
+
+def get_wage_statistics(data, index_base, template):
+    """Number, sum and sum of squares of wages of each agent per period.
+
+    Wages are centered at the period mean of the full data to avoid cancellation
+    in the variance.
+    """
+    agents = index_base.get_indexer(data.index.get_level_values("Identifier"))
+    periods = template.index.get_indexer(data.index.get_level_values("Period"))
+    wages = data["Wage"].to_numpy(dtype=float)
+
+    is_valid = ~np.isnan(wages) & (periods >= 0)
+    agents, periods, wages = agents[is_valid], periods[is_valid], wages[is_valid]
+
+    center = np.nan_to_num(template["mean"].to_numpy(dtype=float))
+    wages = wages - center[periods]
+
+    stats = np.zeros((3, len(index_base), len(template)))
+    np.add.at(stats[0], (agents, periods), 1)
+    np.add.at(stats[1], (agents, periods), wages)
+    np.add.at(stats[2], (agents, periods), wages**2)
+
+    return stats, center
+
+
+def calc_wage_distribution_boot(indicator, stats):
+    """Wage distribution of bootstrap replicates, see ``calc_wage_distribution``."""
+    (count, total, squares), center = stats
+    count, total, squares = indicator @ count, indicator @ total, indicator @ squares
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+        var = (squares - total * mean) / (count - 1)
+        std = np.where(count > 1, np.sqrt(np.clip(var, 0, None)), np.nan)
+
+    return np.stack([mean + center, std], axis=2).reshape(len(indicator), -1)
+
+
+# Moments with a batched implementation in the format
+# key = moment function, value = (sufficient statistics, bootstrapped moments).
+BATCHED_MOMENTS = {
+    calc_choice_frequencies: (get_choice_statistics, calc_choice_frequencies_boot),
+    calc_wage_distribution: (get_wage_statistics, calc_wage_distribution_boot),
+    _moments.calc_choice_frequencies: (
+        get_choice_statistics,
+        calc_choice_frequencies_boot,
+    ),
+    _moments.calc_wage_distribution: (get_wage_statistics, calc_wage_distribution_boot),
+}
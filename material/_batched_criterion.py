@@ -0,0 +1,178 @@
+"""Cache of the last evaluations and batched forward differences of a criterion."""
+import abc
+import multiprocessing as mp
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Criterion of a worker process, built once by ``init_worker``.
+WORKER_CRITERION = None
+
+
+def init_worker(criterion_class, init_args, cache_size):
+    """Build the criterion once in each worker process of a pool."""
+    global WORKER_CRITERION
+    WORKER_CRITERION = criterion_class(*init_args, cache_size=cache_size)
+
+
+def compute_in_worker(params_group):
+    """Compute the results of a group of parameter vectors in a worker process."""
+    return [WORKER_CRITERION.compute(params) for params in params_group]
+
+
+class BatchedCriterion(abc.ABC):
+    """Criterion that reuses the results of the last parameter vectors.
+
+    The result of the last ``cache_size`` parameter vectors is kept, so that
+    repeated evaluations, e.g. at the start of a line search, are not computed
+    again. Finite-difference perturbations are evaluated as one batch across a
+    process pool.
+
+    Subclasses implement ``compute``, which returns the result that is cached for a
+    parameter vector, and ``get_value``, which returns the criterion value of a
+    result. They pass their positional constructor arguments as ``init_args``,
+    from which each worker process builds its own criterion once. The pool is kept
+    until ``close`` is called.
+    """
+
+    def __init__(self, init_args, cache_size=8):
+        self.init_args = init_args
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.pool = None
+        self.num_proc = 1
+
+    def __call__(self, params):
+        return self.get_value(self.get_result(params))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @abc.abstractmethod
+    def compute(self, params):
+        """Compute the result of a parameter vector without the cache."""
+
+    @abc.abstractmethod
+    def get_value(self, result):
+        """Criterion value of a result."""
+
+    def get_key(self, params):
+        """Key of a parameter vector in the cache."""
+        return params["value"].to_numpy(dtype=float).tobytes()
+
+    def add_to_cache(self, cache, key, value):
+        """Add a value to a cache and evict the least recently used."""
+        cache[key] = value
+        cache.move_to_end(key)
+
+        while len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+    def get_result(self, params):
+        """Result of a parameter vector, reused from the cache."""
+        key = self.get_key(params)
+
+        if key in self.cache:
+            self.cache.move_to_end(key)
+        else:
+            self.add_to_cache(self.cache, key, self.compute(params))
+
+        return self.cache[key]
+
+    def group_params(self, params_list):
+        """Groups of parameter vectors that are computed by the same process."""
+        return [[params] for params in params_list]
+
+    def get_pool(self, num_proc):
+        """Pool of processes with a criterion each, created once per size."""
+        if self.pool is None or self.num_proc != num_proc:
+            self.close()
+            self.pool = mp.Pool(
+                num_proc,
+                initializer=init_worker,
+                initargs=(type(self), self.init_args, self.cache_size),
+            )
+            self.num_proc = num_proc
+
+        return self.pool
+
+    def close(self):
+        """Terminate the pool of processes."""
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+    def evaluate_batch(self, params_list, num_proc=1):
+        """Evaluate the criterion for several parameter vectors at once.
+
+        Parameter vectors that are not in the cache are computed across a pool of
+        ``num_proc`` processes, see ``group_params``.
+
+        Returns:
+        --------
+        fvals: np.ndarray
+            Criterion value for each parameter vector.
+
+        """
+        results, params_missing = {}, {}
+        for params in params_list:
+            key = self.get_key(params)
+            if key in self.cache:
+                results[key] = self.get_result(params)
+            else:
+                params_missing[key] = params
+
+        groups = self.group_params(list(params_missing.values()))
+        if len(groups) > 1 and num_proc > 1:
+            results_groups = self.get_pool(num_proc).map(compute_in_worker, groups)
+        else:
+            results_groups = [[self.compute(params) for params in g] for g in groups]
+
+        for group, results_group in zip(groups, results_groups):
+            for params, result in zip(group, results_group):
+                key = self.get_key(params)
+                results[key] = result
+                self.add_to_cache(self.cache, key, result)
+
+        return np.array(
+            [self.get_value(results[self.get_key(params)]) for params in params_list]
+        )
+
+    def gradient(self, params, step=1e-6, index=None, num_proc=1):
+        """Forward-difference gradient of the criterion evaluated as one batch.
+
+        Parameters:
+        -----------
+        params: pd.DataFrame
+            Parameter data frame with a "value" column.
+        step: float
+            Relative step size, scaled with the absolute value of a parameter.
+        index: list
+            Parameters for which the derivative is computed - default all.
+        num_proc: int
+            Number of processes.
+
+        Returns:
+        --------
+        gradient: pd.Series
+            Derivative of the criterion with respect to each parameter.
+
+        """
+        index = params.index if index is None else pd.Index(index)
+
+        steps = step * np.maximum(1, params.loc[index, "value"].abs().to_numpy())
+
+        params_list = [params]
+        for name, h in zip(index, steps):
+            params_step = params.copy()
+            params_step.loc[name, "value"] += h
+            params_list.append(params_step)
+
+        fvals = self.evaluate_batch(params_list, num_proc)
+
+        return pd.Series((fvals[1:] - fvals[0]) / steps, index=index)
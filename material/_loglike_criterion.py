@@ -0,0 +1,116 @@
+"""Likelihood criterion with reuse of criterion values and model solutions."""
+import copy
+import functools
+import os
+import sys
+import warnings
+from collections import OrderedDict
+
+from _batched_criterion import BatchedCriterion
+from respy.likelihood import get_crit_func
+
+sys.path.insert(0, f"{os.environ['PROJECT_ROOT']}/python")
+
+from auxfunc_hooks import get_function
+from auxfunc_hooks import patch_function
+
+# Categories of parameters that only enter the likelihood, but not the solution:
+# measurement errors and the distributions of initial conditions and types.
+MEASUREMENT_CATEGORIES = (
+    "meas_error",
+    "initial_exp_",
+    "lagged_choice_",
+    "observable_",
+    "type_",
+)
+
+# Solution of respy that is memoized, the state space is its first argument.
+SOLVE_FUNCTION = "respy.solve.solve_with_backward_induction"
+
+# Attributes of the state space that hold the solution.
+SOLUTION_ATTRIBUTES = ("emax_value_functions", "expected_value_functions")
+
+
+class LikelihoodCriterion(BatchedCriterion):
+    """Log-likelihood criterion that reuses criterion values and solutions.
+
+    The criterion function is built once with ``get_crit_func``. The values of the
+    last ``cache_size`` parameter vectors are kept, see ``BatchedCriterion``. In
+    addition, the solutions of the last ``cache_size`` vectors of solution-relevant
+    parameters, i.e. all parameters except MEASUREMENT_CATEGORIES, are kept.
+    Parameter vectors that only differ in the measurement part, e.g. the
+    finite-difference perturbations of measurement errors, skip the solution of
+    the model.
+
+    The solution is memoized by replacing SOLVE_FUNCTION during an evaluation and
+    storing copies of SOLUTION_ATTRIBUTES of the state space.
+    """
+
+    def __init__(self, params, options, df, cache_size=8):
+        super().__init__((params, options, df), cache_size)
+        self.crit_func = get_crit_func(
+            params, options, df, return_comparison_plot_data=False
+        )
+        self.solve_func = get_function(SOLVE_FUNCTION)
+        self.solutions = OrderedDict()
+
+    def compute(self, params):
+        """Evaluate the criterion without the cache of criterion values."""
+        wrapper = functools.partial(self.solve, self.get_solution_key(params))
+
+        with patch_function(self.solve_func, wrapper):
+            return self.crit_func(params)
+
+    def get_value(self, fval):
+        """Criterion value, which is the cached result itself."""
+        return fval
+
+    def get_solution_key(self, params):
+        """Key of the solution-relevant parameters in the cache of solutions."""
+        categories = params.index.get_level_values("category")
+        is_measurement = categories.str.startswith(MEASUREMENT_CATEGORIES)
+
+        return params.loc[~is_measurement, "value"].to_numpy(dtype=float).tobytes()
+
+    def group_params(self, params_list):
+        """Parameter vectors that share a solution are computed by the same process,
+        such that each solution of a batch is computed once."""
+        groups = OrderedDict()
+        for params in params_list:
+            groups.setdefault(self.get_solution_key(params), []).append(params)
+
+        return list(groups.values())
+
+    def solve(self, solution_key, state_space, *args, **kwargs):
+        """Solve the model or restore the solution from the cache."""
+        if solution_key in self.solutions:
+            self.solutions.move_to_end(solution_key)
+            attributes, is_state_space, rslt = self.solutions[solution_key]
+
+            for attribute, value in attributes.items():
+                setattr(state_space, attribute, copy.deepcopy(value))
+
+            return state_space if is_state_space else rslt
+
+        rslt = self.solve_func(state_space, *args, **kwargs)
+
+        attributes = {
+            attribute: copy.deepcopy(getattr(state_space, attribute))
+            for attribute in SOLUTION_ATTRIBUTES
+            if hasattr(state_space, attribute)
+        }
+        if not attributes:
+            warnings.warn(
+                f"The state space has none of {SOLUTION_ATTRIBUTES}, the solutions "
+                "are not memoized."
+            )
+            return rslt
+
+        is_state_space = rslt is state_space
+        self.add_to_cache(
+            self.solutions,
+            solution_key,
+            (attributes, is_state_space, None if is_state_space else rslt),
+        )
+
+        return rslt
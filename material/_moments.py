@@ -0,0 +1,70 @@
+"""Vectorized moment functions for the MSM notebook.
+
+The functions are drop-in replacements for ``calc_choice_frequencies`` and
+``calc_wage_distribution`` in ``_auxiliary_msm.py`` and return the same data frames,
+as expected by ``rp.get_flat_moments``. Instead of grouping with pandas, the periods
+and choices are converted to integer codes and aggregated with ``np.bincount``.
+"""
+import numpy as np
+import pandas as pd
+
+
+def get_period_codes(df):
+    """Integer codes and unique values of the periods of a data frame."""
+    if "Period" in df.index.names:
+        periods = df.index.get_level_values("Period")
+    else:
+        periods = df["Period"]
+
+    codes, uniques = pd.factorize(periods, sort=True)
+
+    return codes, pd.Index(uniques, name="Period")
+
+
+def calc_choice_frequencies(df):
+    """Calculation of choice frequencies"""
+    period_codes, periods = get_period_codes(df)
+
+    choice = df["Choice"]
+    if isinstance(choice.dtype, pd.CategoricalDtype):
+        choices = pd.CategoricalIndex(
+            choice.cat.categories, dtype=choice.dtype, name="Choice"
+        )
+        choice_codes = choice.cat.codes.to_numpy()
+    else:
+        choice_codes, uniques = pd.factorize(choice, sort=True)
+        choices = pd.Index(uniques, name="Choice")
+
+    is_valid = (choice_codes >= 0) & (period_codes >= 0)
+    keys = period_codes[is_valid] * len(choices) + choice_codes[is_valid]
+    counts = np.bincount(keys, minlength=len(periods) * len(choices)).reshape(
+        len(periods), len(choices)
+    )
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shares = counts / counts.sum(axis=1, keepdims=True)
+
+    # Without categories, choices that do not occur in a period are missing.
+    if not isinstance(choice.dtype, pd.CategoricalDtype):
+        shares[counts == 0] = np.nan
+
+    return pd.DataFrame(shares, index=periods, columns=choices)
+
+
+def calc_wage_distribution(df):
+    """Calculation of wage distribution"""
+    period_codes, periods = get_period_codes(df)
+    wages = df["Wage"].to_numpy(dtype=float)
+
+    is_valid = ~np.isnan(wages) & (period_codes >= 0)
+    codes, wages = period_codes[is_valid], wages[is_valid]
+
+    count = np.bincount(codes, minlength=len(periods))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.bincount(codes, wages, minlength=len(periods)) / count
+        squares = np.bincount(codes, (wages - mean[codes]) ** 2, minlength=len(periods))
+        std = np.sqrt(squares / (count - 1))
+
+    std[count < 2] = np.nan
+
+    return pd.DataFrame({"mean": mean, "std": std}, index=periods)
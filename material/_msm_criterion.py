@@ -0,0 +1,71 @@
+"""MSM criterion with common random numbers and reuse of simulated moments."""
+import respy as rp
+from _batched_criterion import BatchedCriterion
+
+
+class MSMCriterion(BatchedCriterion):
+    """Criterion function for the estimation with MSM.
+
+    The simulate function is built once, such that the shocks are drawn once from
+    ``options["simulation_seed"]`` and every evaluation uses the same draws (common
+    random numbers). The simulated moments of the last ``cache_size`` parameter
+    vectors are kept and finite-difference perturbations are simulated as one
+    batch, see ``BatchedCriterion``.
+
+    The criterion is the same as returned by ``rp.get_msm_func`` with
+    ``return_scalar=True``.
+    """
+
+    def __init__(
+        self,
+        params,
+        options,
+        calc_moments,
+        replace_nans,
+        empirical_moments,
+        weighting_matrix,
+        cache_size=8,
+    ):
+        super().__init__(
+            (
+                params,
+                options,
+                calc_moments,
+                replace_nans,
+                empirical_moments,
+                weighting_matrix,
+            ),
+            cache_size,
+        )
+        self.simulate = rp.get_simulate_func(params, options)
+        self.calc_moments = calc_moments
+        self.replace_nans = replace_nans
+        self.empirical_moments = empirical_moments
+        self.flat_empirical_moments = rp.get_flat_moments(empirical_moments)
+        self.weighting_matrix = weighting_matrix
+
+    def compute(self, params):
+        """Simulate the flat moments of a parameter vector without the cache."""
+        df = self.simulate(params)
+
+        simulated_moments = {}
+        for key in self.calc_moments.keys():
+            moments = self.calc_moments[key](df)
+            moments = moments.reindex_like(self.empirical_moments[key])
+            simulated_moments[key] = self.replace_nans(moments)
+
+        return rp.get_flat_moments(simulated_moments)
+
+    def get_value(self, flat_moments):
+        """Weighted sum of squared moment errors."""
+        moment_errors = (self.flat_empirical_moments - flat_moments).to_numpy()
+
+        return moment_errors @ self.weighting_matrix @ moment_errors
+
+    def get_moments(self, params):
+        """Flat simulated moments of a parameter vector, reused from the cache."""
+        return self.get_result(params)
+
+    def get_moment_errors(self, params):
+        """Difference between the empirical and the simulated moments."""
+        return (self.flat_empirical_moments - self.get_moments(params)).to_numpy()
@@ -0,0 +1,76 @@
+"""Micro-benchmark of the pandas and the vectorized moment functions."""
+import timeit
+
+import _auxiliary_msm
+import _moments
+import numpy as np
+import pandas as pd
+
+# Define benchmark parameters
+NUM_AGENTS = [1_000, 10_000]
+NUM_PERIODS = 40
+CHOICES = ["a", "b", "edu", "home"]
+REPETITIONS = 5
+NUMBER = 10
+
+MOMENTS = ["calc_choice_frequencies", "calc_wage_distribution"]
+
+
+def get_synthetic_panel(num_agents, num_periods, seed=0):
+    """Create a panel with the choices and wages of a simulated respy model."""
+    np.random.seed(seed)
+    index = pd.MultiIndex.from_product(
+        [range(num_agents), range(num_periods)], names=["Identifier", "Period"]
+    )
+    choices = np.random.choice(CHOICES, len(index))
+    wages = np.where(
+        np.isin(choices, ["a", "b"]), np.random.lognormal(9, 0.5, len(index)), np.nan
+    )
+
+    return pd.DataFrame(
+        {"Choice": pd.Categorical(choices, categories=CHOICES), "Wage": wages},
+        index=index,
+    )
+
+
+def benchmark_moment(moment, df, repetitions, number):
+    """Compare the run time of the pandas and the vectorized moment function.
+
+    Returns:
+    --------
+    rslt: dict
+        Best run time per call in seconds of both implementations.
+
+    """
+    funcs = {
+        "pandas": getattr(_auxiliary_msm, moment),
+        "vectorized": getattr(_moments, moment),
+    }
+
+    pd.testing.assert_frame_equal(funcs["pandas"](df), funcs["vectorized"](df))
+
+    rslt = {}
+    for label, func in funcs.items():
+        rslt[label] = (
+            min(timeit.repeat(lambda: func(df), repeat=repetitions, number=number))
+            / number
+        )
+
+    return rslt
+
+
+if __name__ == "__main__":
+
+    times = {}
+    for num_agents in NUM_AGENTS:
+        df = get_synthetic_panel(num_agents, NUM_PERIODS)
+        for moment in MOMENTS:
+            times[(moment, num_agents)] = benchmark_moment(
+                moment, df, REPETITIONS, NUMBER
+            )
+
+    df_times = pd.DataFrame.from_dict(times, orient="index")
+    df_times.index.names = ["Moment", "Agents"]
+    df_times["Speedup"] = df_times["pandas"] / df_times["vectorized"]
+
+    print(df_times)
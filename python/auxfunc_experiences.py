@@ -0,0 +1,123 @@
+""" Module for the aggregation of experiences of simulated models, shared by the robustness
+and the comparative statics analysis """
+import numpy as np
+import pandas as pd
+
+# Experience columns of the simulated models (KW94 / KW97) and their labels
+EXPERIENCE_COLUMNS = {
+    "kw_94": {
+        "Experience_Edu": "School",
+        "Experience_B": "White",
+        "Experience_A": "Blue",
+    },
+    "kw_97": {
+        "Experience_Blue_Collar": "Blue",
+        "Experience_White_Collar": "White",
+        "Experience_Military": "Military",
+        "Experience_School": "School",
+    },
+}
+
+
+def get_dict_labels(dictionary):
+    """Returns the keys of a dictionary as list.
+
+    Args:
+        dictionary (dict): Arbitrary dictionary, e.g. used for parametrization.
+
+    Returns:
+        dict_labels (list): List of dicationary keys.
+
+    """
+    dict_labels = list(dictionary.keys())
+
+    return dict_labels
+
+
+def get_experience_columns(columns):
+    """Detect the experience columns of the model that has been simulated.
+
+    The experience columns of KW94 and KW97 are returned in the order of
+    ``EXPERIENCE_COLUMNS``, those of other models in the order of the data.
+
+    Args:
+        columns (list): Columns of a simulated model, e.g. ``df.columns``.
+
+    Returns:
+        experience_columns (list): Experience columns of the detected model.
+
+    """
+    experience_columns = [
+        column for column in columns if str(column).startswith("Experience_")
+    ]
+
+    for model_columns in EXPERIENCE_COLUMNS.values():
+        if set(model_columns) == set(experience_columns):
+            return get_dict_labels(model_columns)
+
+    if not experience_columns:
+        raise ValueError("Unable to detect the experience columns of the model.")
+
+    return experience_columns
+
+
+def get_max_experiences(df, experience_columns):
+    """Calculate the maximum of all experience columns per agent in one pass.
+
+    As the simulated data is sorted by identifier, the agents are separated by
+    index boundaries and the maximum is a single ``np.maximum.reduceat``.
+
+    Args:
+        df (pd.DataFrame): Simulated model indexed by identifier and period.
+
+        experience_columns (list): Experience columns to aggregate.
+
+    Returns:
+        max_experiences (np.ndarray): Array of shape (agents, columns) with
+            the maximum experience of each agent.
+
+    """
+    identifier = df.index.get_level_values("Identifier")
+
+    if not identifier.is_monotonic_increasing:
+        return df.groupby("Identifier")[experience_columns].max().to_numpy()
+
+    identifier = identifier.to_numpy()
+    boundaries = np.flatnonzero(np.r_[True, identifier[1:] != identifier[:-1]])
+
+    return np.maximum.reduceat(df[experience_columns].to_numpy(), boundaries, axis=0)
+
+
+def eval_mean_max_experiences(dict_dfs, experience_columns=None):
+    """Calculate average years of experience for any number of ambiguity levels.
+
+    Args:
+        dict_dfs (dict): Dictionary of simulated models in the format
+            key = ambiguity level, value = pd.DataFrame.
+
+        experience_columns (list): Experience columns to aggregate - default None
+            (detected from the first model, see ``get_experience_columns``).
+
+    Returns:
+        df_exp (pd.DataFrame): Average of the maximum experience per agent,
+            with one row per ambiguity level and one column per experience.
+
+    """
+    if experience_columns is None:
+        df = next(iter(dict_dfs.values()))
+        experience_columns = get_experience_columns(df.columns)
+
+    mean_max_experiences = np.array(
+        [
+            get_max_experiences(df, experience_columns).mean(axis=0)
+            for df in dict_dfs.values()
+        ]
+    ).reshape(-1, len(experience_columns))
+
+    df_exp = pd.DataFrame(
+        mean_max_experiences,
+        index=get_dict_labels(dict_dfs),
+        columns=experience_columns,
+    )
+
+    return df_exp
@@ -0,0 +1,41 @@
+""" Module for replacing functions of respy during a computation, e.g. to profile or
+memoize the solution """
+import contextlib
+import importlib
+import sys
+
+
+def get_function(function):
+    """Function given by its full name, e.g. "respy.solve._full_solution".
+
+    Raises an ImportError or AttributeError if the function is not available in
+    the installed version of the package.
+    """
+    module_name, name = function.rsplit(".", 1)
+
+    return getattr(importlib.import_module(module_name), name)
+
+
+@contextlib.contextmanager
+def patch_function(func, wrapper):
+    """Replace a function by a wrapper in all modules of its package.
+
+    Functions imported by name are bound in the namespace of each module, all of
+    them are replaced while the context is active and restored afterwards.
+    """
+    package = func.__module__.split(".")[0]
+
+    patched = []
+    for module in list(sys.modules.values()):
+        if getattr(module, "__name__", "").split(".")[0] != package:
+            continue
+        for attr, value in list(vars(module).items()):
+            if value is func:
+                setattr(module, attr, wrapper)
+                patched.append((module, attr))
+
+    try:
+        yield
+    finally:
+        for module, attr in reversed(patched):
+            setattr(module, attr, func)
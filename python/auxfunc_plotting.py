@@ -1,5 +1,84 @@
 """ Module for plotting functions of the auxiliary notebooks """
 import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+
+def get_choice_shares(dfs, choices):
+    """
+    The function computes the choice shares in each period for a list of dataframes
+    in one batch.
+
+    Input:
+        dfs: list of dataframes of simulated / observed data.
+
+        choices: list of choices for which the shares are computed.
+
+    Output:
+        shares: array of shape (dataframes, periods, choices) with the share of
+            each choice among all choices in a period (NaN without observations).
+    """
+
+    level_codes, period_codes, choice_codes = [], [], []
+    for level, df in enumerate(dfs):
+        if "Period" in df.index.names:
+            periods = df.index.get_level_values("Period").to_numpy()
+        else:
+            periods = df["Period"].to_numpy()
+
+        is_valid = df["Choice"].notna().to_numpy()
+        codes = pd.Categorical(df["Choice"], categories=choices).codes
+
+        level_codes.append(np.full(is_valid.sum(), level))
+        period_codes.append(periods[is_valid].astype(np.int64))
+        choice_codes.append(codes[is_valid])
+
+    level_codes = np.concatenate(level_codes)
+    period_codes = np.concatenate(period_codes)
+    choice_codes = np.concatenate(choice_codes)
+
+    num_levels, num_choices = len(dfs), len(choices)
+    num_periods = period_codes.max() + 1 if len(period_codes) else 0
+
+    # The shares are relative to all choices, including the ones not selected.
+    cells = level_codes * num_periods + period_codes
+    totals = np.bincount(cells, minlength=num_levels * num_periods)
+
+    is_selected = choice_codes >= 0
+    counts = np.bincount(
+        cells[is_selected] * num_choices + choice_codes[is_selected],
+        minlength=num_levels * num_periods * num_choices,
+    )
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shares = counts.reshape(num_levels, num_periods, num_choices) / totals.reshape(
+            num_levels, num_periods, 1
+        )
+
+    return shares
+
+
+def plot_choice_shares(ax, shares, labels, width=0.8):
+    """
+    The function draws the choice shares of each period as stacked bars.
+
+    Input:
+        ax: axis to draw on.
+
+        shares: array of shape (periods, choices), see get_choice_shares.
+
+        labels: label of each choice.
+
+        width: width of the bars.
+    """
+
+    periods = np.arange(len(shares))
+    bottom = np.zeros(len(shares))
+    for share, label in zip(shares.T, labels):
+        ax.bar(periods, share, width, bottom=bottom, label=label)
+        bottom += np.nan_to_num(share)
+
+    ax.set_xlabel("Period")
 
 
 def choice_patterns(df, options):
@@ -17,14 +96,10 @@ def choice_patterns(df, options):
 
     fig, ax = plt.subplots()
 
-    shares = (
-        df.groupby("Period")
-        .Choice.value_counts(normalize=True)
-        .unstack()[["edu", "a", "b", "home"]]
-    )
+    shares = get_choice_shares([df], ["edu", "a", "b", "home"])[0]
     labs = ["School", "White", "Blue", "Home"]
 
-    shares.plot.bar(stacked=True, ax=ax, width=0.8)
+    plot_choice_shares(ax, shares, labs, width=0.8)
 
     ax.legend(
         labels=labs, loc="upper center", bbox_to_anchor=(0.5, 1.15), ncol=len(labs)
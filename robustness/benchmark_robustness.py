@@ -0,0 +1,192 @@
+"""This script benchmarks the evaluation functions of the robustness analysis."""
+import timeit
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import respy as rp
+from robustness_library import VALUE_FUNC_COLUMNS_KW94
+from robustness_library import distribute_tasks
+from robustness_library import eval_eu_loss
+from robustness_library import get_cached_simulate_func
+from robustness_library import get_model_specification
+
+# Define benchmark parameters
+AMBIGUITY_VALUES = {
+    "absent": 0.00,
+    "low": 0.01,
+    "high": 0.02,
+}
+NUM_AGENTS = [1_000, 10_000, 100_000]
+NUM_PERIODS = 40
+REPETITIONS = 3
+MODEL = "kw_94_two"
+NUM_SIM_AGENTS = 1000
+AMBIGUITY_GRID = np.linspace(0.00, 0.05, 50)
+NUM_TASKS = 12
+NUM_COLUMNS = 40
+NUM_PROC = 4
+
+
+def get_synthetic_panel(num_agents, num_periods, columns, seed=0):
+    """Create a panel with the index structure of a simulated respy model.
+
+    Args:
+        num_agents (int): Number of agents within the panel.
+
+        num_periods (int): Number of periods per agent.
+
+        columns (list): Names of the (random) columns.
+
+        seed (int): Seed for the random values - default 0.
+
+    Returns:
+        df (pd.DataFrame): Panel indexed by identifier and period.
+
+    """
+    np.random.seed(seed)
+    index = pd.MultiIndex.from_product(
+        [range(num_agents), range(num_periods)], names=["Identifier", "Period"]
+    )
+    df = pd.DataFrame(
+        np.random.uniform(size=(len(index), len(columns))), index=index, columns=columns
+    )
+
+    return df
+
+
+def eval_eu_loss_loop(ambiguity_values, dfs_ambiguity):
+    """Reference implementation of ``eval_eu_loss`` with a loop over agents."""
+    EU, EU_Loss = {}, {}
+    ambiguity_labels = list(ambiguity_values.keys())
+
+    for df, ambiguity_label in zip(dfs_ambiguity, ambiguity_labels):
+        EU[ambiguity_label] = []
+
+        for i in range(0, df.index[-1][0] + 1):
+            EU[ambiguity_label].append(df[VALUE_FUNC_COLUMNS_KW94].loc[(i, 0)].max())
+
+        EU[ambiguity_label] = np.mean(EU[ambiguity_label])
+        EU_Loss[ambiguity_label] = np.abs(
+            (EU[ambiguity_label] - EU["absent"]) / EU["absent"]
+        )
+
+    df_EU = pd.DataFrame.from_dict(EU, orient="index", columns=["EU"])
+    df_EU["EU_Loss"] = pd.Series(EU_Loss)
+
+    return df_EU
+
+
+def benchmark_eu_loss(num_agents, num_periods, repetitions):
+    """Compare the run time of the vectorized and the looped EU loss.
+
+    Returns:
+        rslt (dict): Best run time in seconds of both implementations.
+
+    """
+    dfs_ambiguity = [
+        get_synthetic_panel(num_agents, num_periods, VALUE_FUNC_COLUMNS_KW94, seed)
+        for seed in range(len(AMBIGUITY_VALUES))
+    ]
+
+    pd.testing.assert_frame_equal(
+        eval_eu_loss(AMBIGUITY_VALUES, dfs_ambiguity),
+        eval_eu_loss_loop(AMBIGUITY_VALUES, dfs_ambiguity),
+    )
+
+    rslt = {}
+    for label, func in [("loop", eval_eu_loss_loop), ("vectorized", eval_eu_loss)]:
+        rslt[label] = min(
+            timeit.repeat(
+                lambda: func(AMBIGUITY_VALUES, dfs_ambiguity),
+                repeat=repetitions,
+                number=1,
+            )
+        )
+
+    return rslt
+
+
+def benchmark_simulate_func_cache(model, num_sim_agents, num_periods, ambiguity_grid):
+    """Compare rebuilding the simulate function per eta against the cached one.
+
+    Returns:
+        rslt (dict): Wall-clock time in seconds to simulate the whole grid.
+
+    """
+    params, options = get_model_specification(model, num_sim_agents, num_periods)
+
+    def simulate_rebuild():
+        for ambiguity_value in ambiguity_grid:
+            params_eta = params.copy()
+            params_eta.loc[("eta", "eta"), "value"] = ambiguity_value
+            rp.get_simulate_func(params_eta, options)(params_eta)
+
+    def simulate_cached():
+        for ambiguity_value in ambiguity_grid:
+            params_eta = params.copy()
+            params_eta.loc[("eta", "eta"), "value"] = ambiguity_value
+            get_cached_simulate_func(model, options)(params_eta)
+
+    rslt = {}
+    for label, func in [("rebuild", simulate_rebuild), ("cached", simulate_cached)]:
+        rslt[label] = timeit.timeit(func, number=1)
+
+    return rslt
+
+
+def benchmark_shared_frames(num_tasks, num_agents, num_periods, num_columns, num_proc):
+    """Compare returning panels from the workers by pickling against shared files.
+
+    Returns:
+        rslt (dict): Wall-clock time in seconds to create and collect all panels.
+
+    """
+    columns = [f"Column_{num}" for num in range(num_columns)]
+    func_task = partial(get_synthetic_panel, num_agents, num_periods, columns)
+
+    rslt = {}
+    for label, shared_frames in [("pickled", False), ("shared", True)]:
+        rslt[label] = timeit.timeit(
+            lambda: distribute_tasks(
+                func_task, range(num_tasks), num_proc, shared_frames=shared_frames
+            ),
+            number=1,
+        )
+
+    return rslt
+
+
+def main():
+
+    times = {}
+    for num_agents in NUM_AGENTS:
+        times[num_agents] = benchmark_eu_loss(num_agents, NUM_PERIODS, REPETITIONS)
+
+    df_times = pd.DataFrame.from_dict(times, orient="index")
+    df_times.index.name = "Agents"
+    df_times["Speedup"] = df_times["loop"] / df_times["vectorized"]
+
+    print(df_times)
+
+    times = benchmark_simulate_func_cache(
+        MODEL, NUM_SIM_AGENTS, NUM_PERIODS, AMBIGUITY_GRID
+    )
+    print(
+        f"Simulation of {len(AMBIGUITY_GRID)} ambiguity values: "
+        f"{times['rebuild']:.1f}s rebuilt, {times['cached']:.1f}s cached, "
+        f"speedup {times['rebuild'] / times['cached']:.1f}."
+    )
+
+    times = benchmark_shared_frames(
+        NUM_TASKS, NUM_SIM_AGENTS, NUM_PERIODS, NUM_COLUMNS, NUM_PROC
+    )
+    print(
+        f"Transfer of {NUM_TASKS} panels: {times['pickled']:.1f}s pickled, "
+        f"{times['shared']:.1f}s shared, "
+        f"speedup {times['pickled'] / times['shared']:.1f}."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Columnar store for the simulated panels of an ambiguity grid.
+
+Each ambiguity level is stored in one compressed .npz file with one array per
+column. Integer columns are downcast to the smallest integer type, float columns
+to float32 where this is lossless and non-numeric columns, e.g. "Choice", are
+stored as categorical codes. The members of an .npz file are read on access, such
+that a projection on a few columns does not load the whole panel.
+
+    {path}/eta_{ambiguity_value}.npz
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def get_panel_path(path, ambiguity_value):
+    """Path of the panel of an ambiguity level."""
+    return Path(path) / f"eta_{float(ambiguity_value):.6f}.npz"
+
+
+def downcast_column(values):
+    """Downcast a numeric column to the smallest dtype holding its values."""
+    if pd.api.types.is_bool_dtype(values):
+        return values.to_numpy()
+    elif pd.api.types.is_integer_dtype(values):
+        return pd.to_numeric(values, downcast="integer").to_numpy()
+    elif pd.api.types.is_float_dtype(values):
+        values = values.to_numpy()
+        values_32 = values.astype(np.float32)
+        if np.allclose(values_32, values, rtol=0, atol=0, equal_nan=True):
+            return values_32
+        return values
+    else:
+        raise TypeError(f"Column of dtype {values.dtype} is not numeric.")
+
+
+def get_panel_arrays(df):
+    """Arrays of the columns and the index of a simulated panel."""
+    arrays = {
+        "meta.columns": np.array(df.columns, dtype=str),
+        "meta.index": np.array(df.index.names, dtype=str),
+    }
+
+    for level in df.index.names:
+        arrays[f"index.{level}"] = downcast_column(
+            pd.Series(df.index.get_level_values(level))
+        )
+
+    for column in df.columns:
+        values = df[column]
+        if pd.api.types.is_numeric_dtype(values) and not isinstance(
+            values.dtype, pd.CategoricalDtype
+        ):
+            arrays[f"column.{column}"] = downcast_column(values)
+        else:
+            values = values.astype("category")
+            arrays[f"column.{column}"] = downcast_column(pd.Series(values.cat.codes))
+            categories = values.cat.categories.to_numpy()
+            if not pd.api.types.is_numeric_dtype(categories):
+                categories = categories.astype(str)
+            arrays[f"categories.{column}"] = categories
+            arrays[f"ordered.{column}"] = np.array(values.cat.ordered)
+
+    return arrays
+
+
+def write_panel(df, path, ambiguity_value):
+    """Write the simulated panel of an ambiguity level.
+
+    Parameters:
+    -----------
+    df: pd.DataFrame
+        Simulated panel, e.g. indexed by "Identifier" and "Period".
+    path: Path
+        Directory of the panel store.
+    ambiguity_value: float
+        Ambiguity level of the simulated panel.
+
+    """
+    path_panel = get_panel_path(path, ambiguity_value)
+    path_panel.parent.mkdir(parents=True, exist_ok=True)
+
+    arrays = get_panel_arrays(df)
+    arrays["meta.ambiguity_value"] = np.array(ambiguity_value, dtype=float)
+
+    # Write to a temporary file first, such that an interrupted write does not
+    # leave a broken panel.
+    path_tmp = path_panel.with_suffix(f".{os.getpid()}.tmp")
+    with open(path_tmp, "wb") as file:
+        np.savez_compressed(file, **arrays)
+    os.replace(path_tmp, path_panel)
+
+
+def write_panels(dict_dfs, path):
+    """Write the simulated panels of an ambiguity grid.
+
+    Parameters:
+    -----------
+    dict_dfs: dict
+        Dictionary in the format key = ambiguity level, value = pd.DataFrame.
+    path: Path
+        Directory of the panel store.
+
+    """
+    for ambiguity_value, df in dict_dfs.items():
+        write_panel(df, path, ambiguity_value)
+
+
+def read_panel(path, ambiguity_value, columns=None):
+    """Read the simulated panel of an ambiguity level.
+
+    Parameters:
+    -----------
+    path: Path
+        Directory of the panel store.
+    ambiguity_value: float
+        Ambiguity level of the simulated panel.
+    columns: list
+        Columns to read - default all.
+
+    Returns:
+    --------
+    df: pd.DataFrame
+        Simulated panel with the downcast dtypes of the store.
+
+    """
+    with np.load(get_panel_path(path, ambiguity_value)) as panel:
+        if columns is None:
+            columns = panel["meta.columns"].tolist()
+
+        index_names = panel["meta.index"].tolist()
+        index = pd.MultiIndex.from_arrays(
+            [panel[f"index.{level}"] for level in index_names], names=index_names
+        )
+
+        data = {}
+        for column in columns:
+            values = panel[f"column.{column}"]
+            if f"categories.{column}" in panel.files:
+                values = pd.Categorical.from_codes(
+                    values,
+                    categories=panel[f"categories.{column}"],
+                    ordered=bool(panel[f"ordered.{column}"]),
+                )
+            data[column] = values
+
+    return pd.DataFrame(data, index=index, columns=columns)
+
+
+def get_ambiguity_values(path):
+    """Sorted ambiguity levels of the panels in a store."""
+    ambiguity_values = []
+    for path_panel in Path(path).glob("eta_*.npz"):
+        with np.load(path_panel) as panel:
+            ambiguity_values.append(float(panel["meta.ambiguity_value"]))
+
+    return sorted(ambiguity_values)
+
+
+def get_panel_columns(path):
+    """Columns of the panels in a store, read from the panel of the first level."""
+    with np.load(get_panel_path(path, get_ambiguity_values(path)[0])) as panel:
+        return panel["meta.columns"].tolist()
+
+
+def read_panels(path, columns=None, ambiguity_values=None):
+    """Read the simulated panels of an ambiguity grid.
+
+    Parameters:
+    -----------
+    path: Path
+        Directory of the panel store.
+    columns: list
+        Columns to read - default all.
+    ambiguity_values: list
+        Ambiguity levels to read - default all levels in the store.
+
+    Returns:
+    --------
+    dict_dfs: dict
+        Dictionary in the format key = ambiguity level, value = pd.DataFrame.
+
+    """
+    if ambiguity_values is None:
+        ambiguity_values = get_ambiguity_values(path)
+
+    return {
+        ambiguity_value: read_panel(path, ambiguity_value, columns)
+        for ambiguity_value in ambiguity_values
+    }
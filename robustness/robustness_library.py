@@ -1,11 +1,35 @@
 """This module contains functions needed for the robustness analysis. """
+import hashlib
+import json
 import multiprocessing as mp
 import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
 
 import numpy as np
 import pandas as pd
 import respy as rp
 
+sys.path.insert(0, f"{os.environ['PROJECT_ROOT']}/python")
+
+from auxfunc_experiences import eval_mean_max_experiences
+from auxfunc_experiences import get_dict_labels
+from auxfunc_experiences import get_experience_columns
+from auxfunc_experiences import get_max_experiences
+
+# KW94 specific
+VALUE_FUNC_COLUMNS_KW94 = [
+    "Value_Function_A",
+    "Value_Function_B",
+    "Value_Function_Edu",
+    "Value_Function_Home",
+]
+
+# Per-process cache of the simulate functions, see ``CachedSimulateFunc``
+SIMULATE_FUNCS = {}
+
 
 def get_model_specification(
     model="kw_94_two", num_sim_agents=1000, num_periods=40, import_data=False
@@ -41,20 +65,65 @@ def get_model_specification(
     return params, options
 
 
-# Should potentially go to an auxiliary module
-def get_dict_labels(dictionary):
-    """Returns the keys of a dictionary as list.
+def get_cached_simulate_func(model, options):
+    """Get the simulate function of a model from the per-process cache.
+
+    The state space is built and the simulation is compiled only once per process
+    for each combination of model and options.
 
     Args:
-        dictionary (dict): Arbitrary dictionary, e.g. used for parametrization.
+        model (str): Name of the respy example model.
+
+        options (dict): Options used in respy.
 
     Returns:
-        dict_labels (list): List of dicationary keys.
+        simulate_func (callable): Simulation function as generated by respy.
 
     """
-    dict_labels = list(dictionary.keys())
+    key = (model, json.dumps(options, sort_keys=True, default=str))
+
+    if key not in SIMULATE_FUNCS:
+        SIMULATE_FUNCS[key] = get_simulate_func(model, options)
+
+    return SIMULATE_FUNCS[key]
 
-    return dict_labels
+
+def get_simulate_func(model, options):
+    """Build the simulate function of a model with ambiguity.
+
+    Args:
+        model (str): Name of the respy example model.
+
+        options (dict): Options used in respy.
+
+    Returns:
+        simulate_func (callable): Simulation function as generated by respy.
+
+    """
+    params, _ = rp.get_example_model(model, with_data=False)
+    params.loc[("eta", "eta"), "value"] = 0.00
+    params.loc[("eta", "eta"), "comment"] = "value of the ambiguity set"
+
+    return rp.get_simulate_func(params, options)
+
+
+class CachedSimulateFunc:
+    """Simulate function that is built once per process on its first call.
+
+    Only the name of the model and the options are sent to the workers. Each
+    worker builds the state space and compiles the simulation on its first task
+    and afterwards only swaps the parameters, e.g. the value of eta.
+
+    """
+
+    def __init__(self, model, options):
+        self.model = model
+        self.options = options
+
+    def __call__(self, params):
+        simulate_func = get_cached_simulate_func(self.model, self.options)
+
+        return simulate_func(params)
 
 
 def eval_experience_effect_ambiguity(
@@ -75,18 +144,34 @@ def eval_experience_effect_ambiguity(
             effect of ambiguity levels (from dfs_ambiguity) on years of experience.
 
     """
-    yoe_effect_ambiguity = {}
     ambiguity_labels = get_dict_labels(ambiguity_values)
 
-    for df, ambiguity_label in zip(dfs_ambiguity, ambiguity_labels):
-        exp_edu = df.groupby("Identifier")["Experience_Edu"].max().mean()
-        exp_b = df.groupby("Identifier")["Experience_B"].max().mean()  # white collar
-        exp_a = df.groupby("Identifier")["Experience_A"].max().mean()  # blue collar
+    df_exp = eval_mean_max_experiences(dict(zip(ambiguity_labels, dfs_ambiguity)))
+
+    return get_yoe_effect_ambiguity(df_exp, years_education, num_periods)
+
 
+def get_yoe_effect_ambiguity(df_exp, years_education, num_periods):
+    """Assemble the years of experience (KW94) including the years at home.
+
+    Args:
+        df_exp (pd.DataFrame): Average of the maximum experience per agent,
+            as returned by ``eval_mean_max_experiences``.
+
+    Returns:
+        df_yoe_effect_ambiguity (pd.DataFrame): Dataframe that summarizes the
+            effect of ambiguity levels on years of experience.
+
+    """
+    yoe_effect_ambiguity = {}
+
+    for ambiguity_label, (exp_edu, exp_b, exp_a) in zip(
+        df_exp.index, df_exp.to_numpy()
+    ):
         yoe_effect_ambiguity[ambiguity_label] = [
             exp_edu,
-            exp_b,
-            exp_a,
+            exp_b,  # white collar
+            exp_a,  # blue collar
             (years_education + num_periods) - exp_edu - exp_b - exp_a,
         ]
 
@@ -101,7 +186,7 @@ def eval_experience_effect_ambiguity(
     return df_yoe_effect_ambiguity
 
 
-def eval_eu_loss(ambiguity_values, dfs_ambiguity):
+def eval_eu_loss(ambiguity_values, dfs_ambiguity, value_func_columns=None):
     """Calculate the expected utility loss that results from a setting that
     incorporates different levels of ambiguity.
 
@@ -112,31 +197,43 @@ def eval_eu_loss(ambiguity_values, dfs_ambiguity):
          dfs_ambiguity (list): List of pd.DataFrame objects that containt the
              of simulated models.
 
+        value_func_columns (list): Value function columns over which the
+            maximum is taken - default None (KW94 value functions).
+
     Returns:
         df_EU (pd.DataFrame): Dataframe that summarizes that expected utility
             loss under the various ambiguity scenarios.
     """
-    EU, EU_Loss = {}, {}
+    EU = {}
     ambiguity_labels = get_dict_labels(ambiguity_values)
-    # KW94 specific
-    index_value_func = [
-        "Value_Function_A",
-        "Value_Function_B",
-        "Value_Function_Edu",
-        "Value_Function_Home",
-    ]
+
+    if value_func_columns is None:
+        value_func_columns = VALUE_FUNC_COLUMNS_KW94
 
     # Calculate the Expected Utility and EU loss for each ambiguity value
     # Expected utility = value function at the initial period
     for df, ambiguity_label in zip(dfs_ambiguity, ambiguity_labels):
-        EU[ambiguity_label] = []
-        EU_Loss[ambiguity_label] = []
+        EU[ambiguity_label] = get_initial_value_max(df, value_func_columns).mean()
+
+    return get_eu_loss(EU)
+
+
+def get_eu_loss(EU):
+    """Expected utility loss relative to the scenario without ambiguity.
+
+    Args:
+        EU (dict): Expected utility in the format key = name of scenario, which
+            includes "absent".
+
+    Returns:
+        df_EU (pd.DataFrame): Dataframe that summarizes that expected utility
+            loss under the various ambiguity scenarios.
 
-        # Retrieve the last identifier within looped dataframe
-        for i in range(0, df.index[-1][0] + 1):
-            EU[ambiguity_label].append(df[index_value_func].loc[(i, 0)].max())
+    """
+    EU_Loss = {}
+    ambiguity_labels = get_dict_labels(EU)
 
-        EU[ambiguity_label] = np.mean(EU[ambiguity_label])
+    for ambiguity_label in ambiguity_labels:
         EU_Loss[ambiguity_label] = np.abs(
             (EU[ambiguity_label] - EU["absent"]) / EU["absent"]
         )
@@ -148,12 +245,235 @@ def eval_eu_loss(ambiguity_values, dfs_ambiguity):
     return df_EU
 
 
+def get_initial_value_max(df, value_func_columns):
+    """Maximum over the value functions of each agent in the initial period.
+
+    Args:
+        df (pd.DataFrame): Simulated model indexed by identifier and period.
+
+        value_func_columns (list): Value function columns to maximize over.
+
+    Returns:
+        value_max (np.ndarray): Maximum value function per agent in period 0,
+            ordered by identifier.
+
+    """
+    is_initial = df.index.get_level_values("Period") == 0
+    values = df.loc[is_initial, value_func_columns].to_numpy()
+
+    return values.max(axis=1)
+
+
+def get_partial_aggregates(df, experience_columns, value_func_columns):
+    """Reduce a simulated (chunk of a) model to mergeable partial aggregates.
+
+    The aggregates are sums and counts, such that the aggregates of several
+    chunks of agents are merged by addition with ``merge_partial_aggregates``.
+
+    Args:
+        df (pd.DataFrame): Simulated model indexed by identifier and period.
+
+        experience_columns (list): Experience columns to aggregate, None to
+            detect them with ``get_experience_columns``.
+
+        value_func_columns (list): Value function columns over which the
+            maximum is taken in the initial period.
+
+    Returns:
+        aggregates (dict): Number of agents, sum of the maximum experience per
+            agent, sum of the maximum initial value function per agent and
+            the number of choices per period.
+
+    """
+    if experience_columns is None:
+        experience_columns = get_experience_columns(df.columns)
+
+    choice_counts = df.groupby(["Period", "Choice"]).size().unstack(fill_value=0)
+
+    aggregates = {
+        "num_agents": df.index.get_level_values("Identifier").nunique(),
+        "sum_max_experiences": pd.Series(
+            get_max_experiences(df, experience_columns).sum(axis=0),
+            index=experience_columns,
+        ),
+        "sum_initial_value_max": get_initial_value_max(df, value_func_columns).sum(),
+        "choice_counts": choice_counts,
+    }
+
+    return aggregates
+
+
+def merge_partial_aggregates(partials):
+    """Merge the partial aggregates of several chunks of agents.
+
+    Args:
+        partials (list): Partial aggregates as returned by
+            ``get_partial_aggregates``.
+
+    Returns:
+        aggregates (dict): Merged aggregates of all chunks.
+
+    """
+    aggregates = dict(partials[0])
+
+    for partial in partials[1:]:
+        aggregates["num_agents"] += partial["num_agents"]
+        aggregates["sum_max_experiences"] += partial["sum_max_experiences"]
+        aggregates["sum_initial_value_max"] += partial["sum_initial_value_max"]
+        aggregates["choice_counts"] = aggregates["choice_counts"].add(
+            partial["choice_counts"], fill_value=0
+        )
+
+    return aggregates
+
+
+class ChunkedSimulation:
+    """Simulate a model in chunks of agents and return its partial aggregates.
+
+    The class is used as ``func_task`` in ``distribute_tasks``, where each task
+    is a parameter data frame. Every chunk is reduced to its partial aggregates
+    as soon as it is simulated, such that a worker holds at most one chunk of the
+    panel and only the aggregates are sent back to the parent process.
+
+    Each chunk is simulated with its own seed, ``simulation_seed`` + number of
+    the chunk. The simulate function of a chunk is built for the chunk only and
+    released before the next chunk, instead of being kept in ``SIMULATE_FUNCS``,
+    such that the memory of a worker does not grow with the number of chunks.
+    Hence, the state space is built and the model is solved once per chunk and
+    the chunk size trades memory against repeated solutions. With a single chunk
+    the results equal the ones of the full simulated panel. The experience columns
+    are detected from the simulated model unless they are given.
+
+    """
+
+    def __init__(
+        self,
+        model,
+        options,
+        chunk_size,
+        experience_columns=None,
+        value_func_columns=None,
+    ):
+        self.model = model
+        self.options = options
+        self.chunk_size = chunk_size
+        self.experience_columns = experience_columns
+
+        if value_func_columns is None:
+            value_func_columns = VALUE_FUNC_COLUMNS_KW94
+        self.value_func_columns = value_func_columns
+
+    def get_chunk_options(self):
+        """Options of each chunk with its number of agents and seed."""
+        num_agents = self.options["simulation_agents"]
+
+        chunk_options = []
+        for chunk, start in enumerate(range(0, num_agents, self.chunk_size)):
+            options = dict(self.options)
+            options["simulation_agents"] = min(self.chunk_size, num_agents - start)
+            options["simulation_seed"] = self.options["simulation_seed"] + chunk
+            chunk_options.append(options)
+
+        return chunk_options
+
+    def __call__(self, params):
+        partials = []
+        for options in self.get_chunk_options():
+            simulate_func = get_simulate_func(self.model, options)
+
+            partials.append(
+                get_partial_aggregates(
+                    simulate_func(params),
+                    self.experience_columns,
+                    self.value_func_columns,
+                )
+            )
+
+            # Release the state space and the draws of the chunk.
+            del simulate_func
+
+        return merge_partial_aggregates(partials)
+
+
+def eval_aggregates(ambiguity_values, aggregates, years_education, num_periods):
+    """Evaluate the robustness outputs from the aggregates of simulated models.
+
+    Args:
+        ambiguity_values (dict): Dictionary with various levels of ambiguity
+            to be implemented (key = name of scenario).
+
+        aggregates (dict): Merged aggregates in the format key = name of
+            scenario, value = aggregates as returned by ``ChunkedSimulation``.
+
+    Returns:
+        df_yoe_effect_ambiguity (pd.DataFrame): Effect of ambiguity on years of
+            experience, as returned by ``eval_experience_effect_ambiguity``.
+
+        df_EU (pd.DataFrame): Expected utility loss, as returned by
+            ``eval_eu_loss``.
+
+        choice_shares (dict): Choice shares per period in the format key = name
+            of scenario, value = pd.DataFrame.
+
+    """
+    ambiguity_labels = get_dict_labels(ambiguity_values)
+
+    df_exp = pd.DataFrame(
+        [
+            aggregates[label]["sum_max_experiences"] / aggregates[label]["num_agents"]
+            for label in ambiguity_labels
+        ],
+        index=ambiguity_labels,
+    )
+    df_yoe_effect_ambiguity = get_yoe_effect_ambiguity(
+        df_exp, years_education, num_periods
+    )
+
+    df_EU = get_eu_loss(
+        {
+            label: aggregates[label]["sum_initial_value_max"]
+            / aggregates[label]["num_agents"]
+            for label in ambiguity_labels
+        }
+    )
+
+    choice_shares = {
+        label: aggregates[label]["choice_counts"].div(
+            aggregates[label]["choice_counts"].sum(axis=1), axis=0
+        )
+        for label in ambiguity_labels
+    }
+
+    return df_yoe_effect_ambiguity, df_EU, choice_shares
+
+
 # Distributed tasks for MPI
-def distribute_tasks(func_task, tasks, num_proc=1, is_distributed=False):
+def distribute_tasks(
+    func_task,
+    tasks,
+    num_proc=1,
+    is_distributed=False,
+    unordered=False,
+    chunksize=1,
+    per_core=False,
+    shared_frames=False,
+    shared_dir=None,
+):
     """Distribute workload.
     This function distributes the workload using the ``multiprocessing`` or ``mpi4py`` library.
     It simply creates a pool of processes that allow to work on the tasks using shared or
     distributed memory.
+
+    By default the results are returned as list in the order of the tasks. With
+    ``unordered`` the results are collected in the order of completion, such that
+    idle workers pick up the remaining tasks, and are returned as dictionary keyed by
+    the position of the task. With ``per_core`` one worker per available core is
+    started and the tasks are packed into equally sized chunks for these workers.
+
+    With ``shared_frames`` the workers write the columns of DataFrame results to
+    memory-mapped files in ``shared_dir`` (default /dev/shm) instead of sending the
+    pickled frames back, see ``SharedFrameTask``. The workers and the parent have
+    to run on the same node.
     Notes
     -----
     We need to ensure that the number of processes is never larger as the number of tasks as
@@ -163,8 +483,17 @@ def distribute_tasks(func_task, tasks, num_proc=1, is_distributed=False):
     * MPI Pool, for details for details
     <https://mpi4py.readthedocs.io/en/stable/mpi4py.futures.html#mpipoolexecutor>
     """
+    if per_core:
+        num_proc = os.cpu_count()
+
     num_proc_intern = min(len(tasks), num_proc)
 
+    if per_core:
+        chunksize = -(-len(tasks) // num_proc_intern)
+
+    if shared_frames:
+        func_task = SharedFrameTask(func_task, shared_dir)
+
     if is_distributed:
         assert "PMI_SIZE" in os.environ.keys(), "MPI environment not available."
         from mpi4py.futures import MPIPoolExecutor
@@ -175,6 +504,380 @@ def distribute_tasks(func_task, tasks, num_proc=1, is_distributed=False):
         executor = mp.Pool(num_proc_intern)
 
     with executor as e:
-        rslt = list(e.map(func_task, tasks))
+        if not unordered:
+            rslt = list(e.map(func_task, tasks, chunksize=chunksize))
+        elif is_distributed:
+            rslt = dict(
+                e.map(
+                    IndexedTask(func_task),
+                    enumerate(tasks),
+                    chunksize=chunksize,
+                    unordered=True,
+                )
+            )
+        else:
+            rslt = dict(
+                e.imap_unordered(
+                    IndexedTask(func_task), enumerate(tasks), chunksize=chunksize
+                )
+            )
+
+    if shared_frames:
+        if unordered:
+            rslt = {index: read_shared_frame(value) for index, value in rslt.items()}
+        else:
+            rslt = [read_shared_frame(value) for value in rslt]
 
     return rslt
+
+
+class IndexedTask:
+    """Attach the position of a task to its result for unordered execution."""
+
+    def __init__(self, func_task):
+        self.func_task = func_task
+
+    def __call__(self, indexed_task):
+        index, task = indexed_task
+
+        return index, self.func_task(task)
+
+
+class SharedFrame:
+    """Reference to a DataFrame whose index and blocks of columns are .npy files."""
+
+    def __init__(self, path, index_names, blocks, categories):
+        self.path = path
+        self.index_names = index_names
+        self.blocks = blocks
+        self.categories = categories
+
+
+class SharedFrameTask:
+    """Write DataFrame results of a task to shared memory for the parent process.
+
+    ``multiprocessing.shared_memory`` requires Python 3.8, hence the columns are
+    written as .npy files to a memory-backed file system (/dev/shm), which works
+    for ``mp.Pool`` as well as for MPI workers on the same node. Only the small
+    ``SharedFrame`` reference is pickled. Other results are passed through.
+
+    """
+
+    def __init__(self, func_task, shared_dir=None):
+        self.func_task = func_task
+        self.shared_dir = shared_dir
+
+    def __call__(self, task):
+        rslt = self.func_task(task)
+
+        if isinstance(rslt, pd.DataFrame):
+            rslt = write_shared_frame(rslt, self.shared_dir)
+
+        return rslt
+
+
+def get_shared_dir():
+    """Default directory of the shared frames, memory-backed where available."""
+    if os.path.isdir("/dev/shm"):
+        return "/dev/shm"
+
+    return tempfile.gettempdir()
+
+
+def get_column_blocks(df):
+    """Group the columns into blocks that are stored as one array each.
+
+    Consecutive numeric columns of the same dtype form a block, every other
+    column is a block of its own and is stored as categorical codes.
+
+    Args:
+        df (pd.DataFrame): Data frame, e.g. a simulated model.
+
+    Returns:
+        blocks (list): Lists of columns in the order of the data frame.
+
+    """
+    blocks, dtypes = [], []
+    for column, dtype in df.dtypes.items():
+        is_numeric = pd.api.types.is_numeric_dtype(dtype) and not isinstance(
+            dtype, pd.CategoricalDtype
+        )
+        if is_numeric and dtypes and dtypes[-1] is not None and dtypes[-1] == dtype:
+            blocks[-1].append(column)
+        else:
+            blocks.append([column])
+            dtypes.append(dtype if is_numeric else None)
+
+    return blocks
+
+
+def write_shared_frame(df, shared_dir=None):
+    """Write the index and the blocks of columns of a DataFrame as .npy files.
+
+    A block of numeric columns is written as 2-D array of shape (columns, rows),
+    which is the layout of a block of a data frame. A multi index is written as
+    the codes and the levels of its levels.
+
+    Args:
+        df (pd.DataFrame): Data frame, e.g. a simulated model.
+
+        shared_dir (str or Path): Directory of the shared frames - default None
+            (/dev/shm if available).
+
+    Returns:
+        shared_frame (SharedFrame): Reference to the written data frame.
+
+    """
+    if shared_dir is None:
+        shared_dir = get_shared_dir()
+
+    path = Path(tempfile.mkdtemp(prefix="frame_", dir=shared_dir))
+
+    if df.index.nlevels > 1:
+        for num, (level, codes) in enumerate(zip(df.index.levels, df.index.codes)):
+            np.save(path / f"index_codes_{num}.npy", np.asarray(codes))
+            np.save(path / f"index_levels_{num}.npy", level.to_numpy())
+    else:
+        np.save(path / "index_0.npy", df.index.to_numpy())
+
+    blocks, categories = get_column_blocks(df), {}
+    for num, block in enumerate(blocks):
+        values = df[block[0]]
+        if not pd.api.types.is_numeric_dtype(values) or isinstance(
+            values.dtype, pd.CategoricalDtype
+        ):
+            values = values.astype("category")
+            categories[block[0]] = values.dtype
+            values = values.cat.codes.to_numpy()
+        else:
+            values = np.ascontiguousarray(df[block].to_numpy().T)
+
+        np.save(path / f"block_{num}.npy", values)
+
+    return SharedFrame(str(path), list(df.index.names), blocks, categories)
+
+
+def read_shared_frame(shared_frame):
+    """Rebuild a DataFrame from its shared index and blocks without copying them.
+
+    The files are mapped copy-on-write and removed right away, the mapped memory is
+    released with the last reference to the data frame. Each block of numeric
+    columns becomes one block of the data frame as is and the codes of a multi
+    index or a categorical column are used as is, such that no column is copied or
+    merged. Note that pandas may still consolidate blocks of the same dtype, which
+    are separated by other columns, in later operations.
+
+    Args:
+        shared_frame (SharedFrame): Reference as returned by ``write_shared_frame``,
+            other objects are returned unchanged.
+
+    Returns:
+        df (pd.DataFrame): Data frame with memory-mapped columns.
+
+    """
+    if not isinstance(shared_frame, SharedFrame):
+        return shared_frame
+
+    path = Path(shared_frame.path)
+
+    if len(shared_frame.index_names) > 1:
+        index = pd.MultiIndex(
+            levels=[
+                np.load(path / f"index_levels_{num}.npy", allow_pickle=True)
+                for num in range(len(shared_frame.index_names))
+            ],
+            codes=[
+                np.load(path / f"index_codes_{num}.npy", mmap_mode="c")
+                for num in range(len(shared_frame.index_names))
+            ],
+            names=shared_frame.index_names,
+            verify_integrity=False,
+        )
+    else:
+        index = pd.Index(
+            np.load(path / "index_0.npy", mmap_mode="c"),
+            name=shared_frame.index_names[0],
+            copy=False,
+        )
+
+    frames = []
+    for num, block in enumerate(shared_frame.blocks):
+        values = np.load(path / f"block_{num}.npy", mmap_mode="c")
+        if block[0] in shared_frame.categories:
+            values = pd.Categorical.from_codes(
+                values, dtype=shared_frame.categories[block[0]]
+            )
+            frames.append(pd.DataFrame({block[0]: values}, index=index, copy=False))
+        else:
+            frames.append(
+                pd.DataFrame(values.T, index=index, columns=block, copy=False)
+            )
+
+    if frames:
+        df = pd.concat(frames, axis=1, copy=False)
+    else:
+        df = pd.DataFrame(index=index)
+
+    shutil.rmtree(path)
+
+    return df
+
+
+def get_task_hash(params, options, ambiguity_value):
+    """Hash a simulation task to identify its result in the cache.
+
+    Args:
+        params (pd.DataFrame): Parameter data frame of the model.
+
+        options (dict): Options used in respy.
+
+        ambiguity_value (float): Value of the ambiguity set, eta.
+
+    Returns:
+        task_hash (str): Hexadecimal digest of the task.
+
+    """
+    task_hash = hashlib.sha256()
+    task_hash.update(params["value"].to_csv().encode())
+    task_hash.update(json.dumps(options, sort_keys=True, default=str).encode())
+    task_hash.update(repr(float(ambiguity_value)).encode())
+
+    return task_hash.hexdigest()
+
+
+class CachedSimulation:
+    """Simulate a task and write its result to the cache as soon as it is done.
+
+    The class is used as ``func_task`` in ``distribute_tasks``. Each task is a
+    tuple (task_hash, params), so that every worker persists its own result and
+    an interruption only loses the scenarios that are still running.
+
+    """
+
+    def __init__(self, simulate_func, cache_dir):
+        self.simulate_func = simulate_func
+        self.cache_dir = Path(cache_dir)
+
+    def __call__(self, task):
+        task_hash, params = task
+        path = self.cache_dir / f"{task_hash}.pkl"
+
+        df = self.simulate_func(params)
+
+        # Write to a temporary file first such that the cache never holds
+        # incomplete results.
+        path_tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        df.to_pickle(path_tmp)
+        os.replace(path_tmp, path)
+
+        return task_hash
+
+
+def run_ambiguity_sweep(
+    simulate_func,
+    params,
+    options,
+    ambiguity_values,
+    cache_dir,
+    num_proc=1,
+    is_distributed=False,
+):
+    """Simulate the model for a grid of ambiguity values using an on-disk cache.
+
+    Scenarios that have been simulated before are loaded from the cache. The
+    remaining scenarios are distributed and every result is written to the cache
+    as soon as it is finished, so that an interrupted sweep can be resumed.
+
+    Args:
+        simulate_func (callable): Simulation function as generated by respy.
+
+        params (pd.DataFrame): Parameter data frame of the model including eta.
+
+        options (dict): Options used in respy.
+
+        ambiguity_values (dict): Dictionary with various levels of ambiguity
+            to be implemented (key = name of scenario).
+
+        cache_dir (str or Path): Directory of the result cache.
+
+        num_proc (int): Number of processes - default 1.
+
+        is_distributed (bool): Use MPI instead of multiprocessing - default False.
+
+    Returns:
+        dfs_ambiguity (dict): Simulated models in the format key = name of
+            scenario, value = pd.DataFrame.
+
+    """
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    task_hashes, tasks = {}, []
+    for ambiguity_label, ambiguity_value in ambiguity_values.items():
+        params_eta = params.copy()
+        params_eta.loc[("eta", "eta"), "value"] = ambiguity_value
+
+        task_hash = get_task_hash(params_eta, options, ambiguity_value)
+        task_hashes[ambiguity_label] = task_hash
+
+        if not (cache_dir / f"{task_hash}.pkl").exists():
+            tasks.append((task_hash, params_eta))
+
+    if tasks:
+        distribute_tasks(
+            CachedSimulation(simulate_func, cache_dir),
+            tasks,
+            num_proc,
+            is_distributed,
+            unordered=True,
+        )
+
+    dfs_ambiguity = {
+        ambiguity_label: pd.read_pickle(cache_dir / f"{task_hash}.pkl")
+        for ambiguity_label, task_hash in task_hashes.items()
+    }
+
+    return dfs_ambiguity
+
+
+def run_ambiguity_aggregation(
+    chunked_simulation, params, ambiguity_values, num_proc=1, is_distributed=False
+):
+    """Simulate the model for a grid of ambiguity values and aggregate on the fly.
+
+    In contrast to ``run_ambiguity_sweep`` the simulated panels are never
+    collected, only the aggregates of each scenario are returned.
+
+    Args:
+        chunked_simulation (ChunkedSimulation): Chunked simulation of the model.
+
+        params (pd.DataFrame): Parameter data frame of the model including eta.
+
+        ambiguity_values (dict): Dictionary with various levels of ambiguity
+            to be implemented (key = name of scenario).
+
+        num_proc (int): Number of processes - default 1.
+
+        is_distributed (bool): Use MPI instead of multiprocessing - default False.
+
+    Returns:
+        aggregates (dict): Aggregates in the format key = name of scenario,
+            value = aggregates as returned by ``ChunkedSimulation``.
+
+    """
+    tasks = []
+    for ambiguity_value in ambiguity_values.values():
+        params_eta = params.copy()
+        params_eta.loc[("eta", "eta"), "value"] = ambiguity_value
+        tasks.append(params_eta)
+
+    rslt = distribute_tasks(
+        chunked_simulation, tasks, num_proc, is_distributed, unordered=True
+    )
+
+    aggregates = {
+        ambiguity_label: rslt[index]
+        for index, ambiguity_label in enumerate(ambiguity_values.keys())
+    }
+
+    return aggregates
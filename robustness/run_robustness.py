@@ -2,11 +2,15 @@
 import os
 from pathlib import Path
 
-import respy as rp
-from robustness_library import distribute_tasks
+from panel_store import write_panels
+from robustness_library import CachedSimulateFunc
+from robustness_library import ChunkedSimulation
+from robustness_library import eval_aggregates
 from robustness_library import eval_eu_loss
 from robustness_library import eval_experience_effect_ambiguity
 from robustness_library import get_model_specification
+from robustness_library import run_ambiguity_aggregation
+from robustness_library import run_ambiguity_sweep
 
 # Automatic parallelism turned off
 parallel_off = {
@@ -34,25 +38,39 @@ NUM_PERIODS = 40
 NUM_AGENTS = 1000
 SAVE = False
 
+# Agents per chunk, if set the simulated panels are aggregated within the workers.
+# Each chunk builds the state space and solves the model once more for every ambiguity
+# level, as the simulate function of a chunk is released after the chunk.
+CHUNK_SIZE = None
+
 
 def main():
 
     # Load the example model
     params, options = get_model_specification(MODEL, NUM_AGENTS, NUM_PERIODS, False)
 
-    # Build the simulate function with baseline ambiguity level
-    simulate_func = rp.get_simulate_func(params, options)
+    if CHUNK_SIZE is not None:
+        main_aggregated(params, options)
+        return
 
-    # Create the tasks
-    tasks = []
-    for ambiguity_value in AMBIGUITY_VALUES.values():
-        params, _ = get_model_specification(MODEL, NUM_AGENTS, NUM_PERIODS, False)
-        params.loc[("eta", "eta"), "value"] = ambiguity_value
-        tasks.append(params)
+    # The simulate function is built once within each worker
+    simulate_func = CachedSimulateFunc(MODEL, options)
 
-    # MPI processing
+    # MPI processing, finished scenarios are loaded from the cache
     num_proc, is_distributed = 3, True
-    dfs_ambiguity = distribute_tasks(simulate_func, tasks, num_proc, is_distributed)
+    dfs_ambiguity = run_ambiguity_sweep(
+        simulate_func,
+        params,
+        options,
+        AMBIGUITY_VALUES,
+        subdir_robustness / "cache",
+        num_proc,
+        is_distributed,
+    )
+    dict_dfs_ambiguity = {
+        AMBIGUITY_VALUES[label]: df for label, df in dfs_ambiguity.items()
+    }
+    dfs_ambiguity = list(dfs_ambiguity.values())
 
     # Evaluate effect of ambiguity on years of experience.
     df_yoe_effect_ambiguity = eval_experience_effect_ambiguity(
@@ -62,11 +80,36 @@ def main():
     # Evaluate expected utility loss
     df_eu_loss = eval_eu_loss(AMBIGUITY_VALUES, dfs_ambiguity)
 
-    # Save as pickle files
+    # Save simulated panels in the panel store, results as pickle files
     if SAVE:
-        for num in range(0, len(dfs_ambiguity)):
-            dfs_ambiguity[num].to_pickle(subdir_robustness / f"dfs_ambiguity_{num}.pkl")
+        write_panels(dict_dfs_ambiguity, subdir_robustness / "panels")
+
+        df_yoe_effect_ambiguity.to_pickle(
+            subdir_robustness / "df_yoe_effect_ambiguity.pkl"
+        )
+
+        df_eu_loss.to_pickle(subdir_robustness / "df_EU.pkl")
 
+
+def main_aggregated(params, options):
+    """Evaluate the robustness outputs without collecting the simulated panels."""
+
+    # MPI processing, each worker returns the aggregates of one scenario
+    num_proc, is_distributed = 3, True
+    aggregates = run_ambiguity_aggregation(
+        ChunkedSimulation(MODEL, options, CHUNK_SIZE),
+        params,
+        AMBIGUITY_VALUES,
+        num_proc,
+        is_distributed,
+    )
+
+    df_yoe_effect_ambiguity, df_eu_loss, _ = eval_aggregates(
+        AMBIGUITY_VALUES, aggregates, YEARS_EDUCATION, NUM_PERIODS
+    )
+
+    # Save as pickle files
+    if SAVE:
         df_yoe_effect_ambiguity.to_pickle(
             subdir_robustness / "df_yoe_effect_ambiguity.pkl"
         )
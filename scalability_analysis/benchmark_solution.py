@@ -0,0 +1,155 @@
+"""Benchmark harness for the execution time of respy's full solution."""
+import time
+
+import numba
+import numpy as np
+import pandas as pd
+from respy.solve import _full_solution
+from threadpoolctl import threadpool_limits
+
+
+def run_full_solution(input_params):
+    """Solve a single period with the sliced input parameters.
+
+    Parameters:
+    -----------
+    input_params: dict
+        Input parameters of a period as stored in ./resources/raw_input_data.
+
+    """
+    return _full_solution(
+        input_params["wages"],
+        input_params["nonpecs"],
+        input_params["continuation_values"],
+        input_params["period_draws_emax_risk"],
+        input_params["optim_paras"],
+    )
+
+
+def time_function(func, iterations, warmup=1):
+    """Time repeated calls of a function with a high-resolution timer.
+
+    Parameters:
+    -----------
+    func: callable
+        Function without arguments that will be timed.
+    iterations: int
+        Number of timed calls.
+    warmup: int
+        Number of untimed calls before the measurement, e.g. to exclude the
+        compilation of numba functions.
+
+    Returns:
+    --------
+    times: np.ndarray
+        Execution time of each call in nanoseconds.
+
+    """
+    for _ in range(warmup):
+        func()
+
+    times = np.empty(iterations, dtype=np.int64)
+    for j in range(iterations):
+        start = time.perf_counter_ns()
+        func()
+        times[j] = time.perf_counter_ns() - start
+
+    return times
+
+
+def get_results_table(times, **labels):
+    """Tidy results table with one row per timed iteration.
+
+    Parameters:
+    -----------
+    times: np.ndarray
+        Execution times in nanoseconds as returned by ``time_function``.
+    labels: dict
+        Constant columns that describe the run, e.g. model, period and threads.
+
+    Returns:
+    --------
+    df_results: pd.DataFrame
+        Table with the label columns, "iteration" and "time_ns".
+
+    """
+    df_results = pd.DataFrame({"iteration": np.arange(len(times)), "time_ns": times})
+    for column, value in reversed(list(labels.items())):
+        df_results.insert(0, column, value)
+
+    return df_results
+
+
+def benchmark_full_solution(input_params, iterations, warmup=1, **labels):
+    """Benchmark the full solution of a period.
+
+    Parameters:
+    -----------
+    input_params: dict
+        Input parameters of a period as stored in ./resources/raw_input_data.
+    iterations: int
+        Number of timed solutions.
+    warmup: int
+        Number of untimed solutions before the measurement.
+    labels: dict
+        Constant columns that describe the run, e.g. model, period and threads.
+
+    Returns:
+    --------
+    df_results: pd.DataFrame
+        Tidy results table including the number of states of the period.
+
+    """
+    times = time_function(lambda: run_full_solution(input_params), iterations, warmup)
+
+    return get_results_table(times, **labels, num_states=input_params["wages"].shape[0])
+
+
+def can_set_num_threads():
+    """Whether numba can change the number of threads at runtime (numba>=0.49)."""
+    return hasattr(numba, "set_num_threads")
+
+
+def benchmark_thread_sweep(input_params, thread_counts, iterations, warmup=1, **labels):
+    """Benchmark the full solution for several numbers of threads in one process.
+
+    The functions are imported and compiled once and the number of threads is
+    changed at runtime for numba and the BLAS backends. Note that numba cannot use
+    more threads than set by "NUMBA_NUM_THREADS" before its import and requires
+    numba>=0.49 to change the number of threads, see ``can_set_num_threads``.
+
+    Parameters:
+    -----------
+    input_params: dict
+        Input parameters of a period as stored in ./resources/raw_input_data.
+    thread_counts: iterable
+        Numbers of threads to iterate through.
+    iterations: int
+        Number of timed solutions per number of threads.
+    warmup: int
+        Number of untimed solutions per number of threads.
+    labels: dict
+        Constant columns that describe the run, e.g. model and period.
+
+    Returns:
+    --------
+    df_results: pd.DataFrame
+        Tidy results table with a "threads" column.
+
+    """
+    if not can_set_num_threads():
+        raise RuntimeError(
+            f"numba {numba.__version__} cannot set the number of threads at runtime."
+        )
+
+    results = []
+    for n_threads in thread_counts:
+        numba.set_num_threads(n_threads)
+        with threadpool_limits(limits=n_threads):
+            results.append(
+                benchmark_full_solution(
+                    input_params, iterations, warmup, **labels, threads=n_threads
+                )
+            )
+
+    return pd.concat(results, ignore_index=True)
@@ -7,55 +7,242 @@ from pathlib import Path
 
 from config import DATA_FORMAT
 from config import INPUT_DATA
+from config import ITERATIONS
 from config import MAX_THREADS_PROCESSES
+from config import MMAP_MODE
+from config import MPI_SCALING
+from config import MPIEXEC
 from config import PERIOD
+from config import SCALABILITY_MATRIX
+from config import SCALING_WORKERS
+from config import THREADS_IN_PROCESS
+from config import WARMUP
+from input_data import convert_input_bundle
+from input_data import has_period
+from input_data import load_period
+from input_data import read_input_bundle
+from results_store import get_model_name
+from results_store import get_scaling_report
+from results_store import has_records
+from results_store import load_results
+from results_store import select_scaling
+from results_store import write_record
 
 SCALABILITY_ANALYSIS = "threads"  # @["threads", "processes"]
 PATH_AUXINPUT_PARAMS = Path(f"./resources/sliced_input_params.{DATA_FORMAT}")
 
 
-def caller_exec_time_threads(MAX_THREADS):
+def get_input_params(input_data, period, input_params_all=None):
+    """Get the input parameters of a period for the workers.
+
+    With DATA_FORMAT "mmap" the period is memory-mapped from the converted input
+    data, which is created on first use. Otherwise, the period is sliced from the
+    bundle and written to PATH_AUXINPUT_PARAMS.
+
+    Parameters:
+    -----------
+    input_data: Path
+        Path of the bundle of input parameters.
+    period: str
+        Period of the input parameters, e.g. "per28".
+    input_params_all: dict
+        Bundle that has already been read from ``input_data``.
+
+    Returns:
+    --------
+    input_params: dict
+        Input parameters of the period.
+
+    """
+    if DATA_FORMAT == "mmap":
+        model = get_model_name(input_data)
+        if not has_period(model, period):
+            convert_input_bundle(input_data)
+
+        return load_period(model, period, MMAP_MODE)
+
+    if input_params_all is None:
+        input_params_all = read_input_bundle(input_data)
+
+    input_params = input_params_all[period]
+    pickle.dump(input_params, open(PATH_AUXINPUT_PARAMS, "wb"))
+
+    return input_params
+
+
+def has_all_records(model, period, kind, max_workers):
+    """Check whether records exist for all numbers of threads or processes of a model
+    and period, for processes of each type of scaling in MPI_SCALING."""
+    scalings = MPI_SCALING if kind == "processes" else [None]
+
+    return all(
+        has_records(model, period, kind, number, scaling)
+        for scaling in scalings
+        for number in range(1, max_workers + 1)
+    )
+
+
+def caller_exec_time_threads(MAX_THREADS, model=None, period=None):
     """Caller for analysis of computation time under different number of threads.
 
+    Numbers of threads with existing records are skipped.
+
     Parameters:
     -----------
     MAX_THREADS: int
         Maximum number of threads that will be iterated through (set in config.py).
+    model: str
+        Model of the input parameters, e.g. "kw_94_one" - default from config.py.
+    period: str
+        Period of the input parameters, e.g. "per28" - default from config.py.
 
     Returns:
     --------
-    times_df_threads_MAX_THREADS.pickle: pd.DataFrame
-        Output saved in ./resources as pd.DataFrame.
+    {model}_{PERIOD}_threads{n_threads}_*.pickle: pd.DataFrame
+        One record per number of threads saved in ./resources/results.
 
     """
+    if model is None:
+        model, period = get_model_name(INPUT_DATA), PERIOD
+
     for n_threads in range(1, MAX_THREADS + 1):
-        call_ = "python exec_time_scalability.py " + str(n_threads)
+        if has_records(model, period, "threads", n_threads):
+            continue
+
+        call_ = f"python exec_time_scalability.py {n_threads} {model} {period}"
         subprocess.call(call_, shell=True)
 
 
-def caller_exec_time_processes(MAX_PROCESSES):
+def caller_exec_time_threads_in_process(MAX_THREADS, input_params, model, period):
+    """Caller for analysis of computation time under different number of threads
+    within the current process. Numbers of threads with existing records are skipped.
+
+    With numba<0.49 the number of threads cannot be changed at runtime and a new
+    interpreter is started for each number of threads instead.
+
+    Parameters:
+    -----------
+    MAX_THREADS: int
+        Maximum number of threads that will be iterated through (set in config.py).
+    input_params: dict
+        Input parameters of the period.
+    model: str
+        Model of the input parameters, e.g. "kw_94_one".
+    period: str
+        Period of the input parameters, e.g. "per28".
+
+    Returns:
+    --------
+    {model}_{period}_threads{n_threads}_*.pickle: pd.DataFrame
+        One record per number of threads saved in ./resources/results.
+
+    """
+    # Numba reads the maximum number of threads at import.
+    os.environ["NUMBA_NUM_THREADS"] = str(MAX_THREADS)
+    from benchmark_solution import benchmark_thread_sweep
+    from benchmark_solution import can_set_num_threads
+
+    if not can_set_num_threads():
+        print("numba cannot set the number of threads, one process per number.")
+        caller_exec_time_threads(MAX_THREADS, model, period)
+        return
+
+    for n_threads in range(1, MAX_THREADS + 1):
+        if has_records(model, period, "threads", n_threads):
+            continue
+
+        df_results = benchmark_thread_sweep(
+            input_params,
+            [n_threads],
+            ITERATIONS["threads"],
+            WARMUP["threads"],
+            model=model,
+            period=period,
+        )
+        write_record(df_results, "threads")
+
+
+def caller_exec_time_processes(MAX_PROCESSES, model, period):
     """Caller for analysis of computation time under different number of processes.
 
+    The rows of the period are distributed over the MPI ranks, see
+    mpi_scalability.py. Numbers of processes with existing records of a type of
+    scaling are skipped.
+
     Parameters:
     -----------
     MAX_PROCESSES: int
         Maximum number of processes that will be iterated through using mpiexec.
+    model: str
+        Model of the input parameters in PATH_AUXINPUT_PARAMS, e.g. "kw_94_one".
+    period: str
+        Period of the input parameters in PATH_AUXINPUT_PARAMS, e.g. "per28".
 
     Returns:
     --------
-    times_df_processes_MAX_PROCESSES.pickle: pd.DataFrame
-        Output saved in ./resources as pd.DataFrame.
+    {model}_{period}_processes{n_processes}_*.pickle: pd.DataFrame
+        One record per type of scaling and number of processes saved in
+        ./resources/results.
 
     """
-    for n_processes in range(1, MAX_PROCESSES + 1):
+    for scaling in MPI_SCALING:
+        for n_processes in range(1, MAX_PROCESSES + 1):
+            if has_records(model, period, "processes", n_processes, scaling):
+                continue
+
+            mpiexec_ = (
+                f"{MPIEXEC} -n "
+                + str(n_processes)
+                + " python mpi_scalability.py "
+                + f"{scaling} {model} {period}"
+            )
+            subprocess.call(mpiexec_, shell=True)
 
-        mpiexec_ = (
-            "mpiexec.hydra -n "
-            + str(n_processes)
-            + " -usize 3 python exec_time_scalability.py "
-            + str(n_processes)
-        )
-        subprocess.call(mpiexec_, shell=True)
+
+def caller_scalability_matrix(matrix, max_threads_processes, scalability_analysis):
+    """Caller for the analysis of computation time for several models and periods.
+
+    Each input file is loaded only once. Combinations of model and period with
+    records for all numbers of threads or processes are skipped, the missing
+    numbers of an interrupted run are completed.
+
+    Parameters:
+    -----------
+    matrix: dict
+        Dictionary in the format key = input file, value = list of periods.
+    max_threads_processes: int
+        Maximum number of threads or processes that will be iterated through.
+    scalability_analysis: str
+        Type of scalability analysis to perform: processes or threads.
+
+    Returns:
+    --------
+    {model}_{period}_{scalability_analysis}{n}_*.pickle: pd.DataFrame
+        One record per model, period and number of threads or processes saved in
+        ./resources/results.
+
+    """
+    for input_data, periods in matrix.items():
+        model = get_model_name(input_data)
+        input_params_all = None
+        if DATA_FORMAT != "mmap":
+            input_params_all = read_input_bundle(input_data)
+
+        for period in periods:
+            if has_all_records(
+                model, period, scalability_analysis, max_threads_processes
+            ):
+                print(f"Records for {model} {period} already available.")
+                continue
+
+            input_params = get_input_params(input_data, period, input_params_all)
+
+            if scalability_analysis == "threads":
+                caller_exec_time_threads_in_process(
+                    max_threads_processes, input_params, model, period
+                )
+            else:
+                caller_exec_time_processes(max_threads_processes, model, period)
 
 
 if __name__ == "__main__":
@@ -63,27 +250,52 @@ if __name__ == "__main__":
     if len(sys.argv) > 1 and sys.argv[1] == "processes":
         SCALABILITY_ANALYSIS = "processes"
 
-    check = Path(
-        "./resources/times_df_"
-        + str(MAX_THREADS_PROCESSES[SCALABILITY_ANALYSIS])
-        + f"{SCALABILITY_ANALYSIS}_{PERIOD}.{DATA_FORMAT}"
-    )
+    if "matrix" in sys.argv[1:]:
+
+        caller_scalability_matrix(
+            SCALABILITY_MATRIX,
+            MAX_THREADS_PROCESSES[SCALABILITY_ANALYSIS],
+            SCALABILITY_ANALYSIS,
+        )
+
+        print(
+            get_scaling_report(
+                select_scaling(load_results(kind=SCALABILITY_ANALYSIS), "strong"),
+                SCALABILITY_ANALYSIS,
+                SCALING_WORKERS,
+            )
+        )
 
-    if not check.exists():
+    elif not has_all_records(
+        get_model_name(INPUT_DATA),
+        PERIOD,
+        SCALABILITY_ANALYSIS,
+        MAX_THREADS_PROCESSES[SCALABILITY_ANALYSIS],
+    ):
 
-        input_params = pickle.load(open(INPUT_DATA, "rb"))[PERIOD]
-        pickle.dump(input_params, open(PATH_AUXINPUT_PARAMS, "wb"))
+        input_params = get_input_params(INPUT_DATA, PERIOD)
 
-        if SCALABILITY_ANALYSIS == "threads":
+        if SCALABILITY_ANALYSIS == "threads" and THREADS_IN_PROCESS:
+            caller_exec_time_threads_in_process(
+                MAX_THREADS_PROCESSES[SCALABILITY_ANALYSIS],
+                input_params,
+                get_model_name(INPUT_DATA),
+                PERIOD,
+            )
+        elif SCALABILITY_ANALYSIS == "threads":
             caller_exec_time_threads(MAX_THREADS_PROCESSES[SCALABILITY_ANALYSIS])
         elif SCALABILITY_ANALYSIS == "processes":
-            caller_exec_time_processes(MAX_THREADS_PROCESSES[SCALABILITY_ANALYSIS])
+            caller_exec_time_processes(
+                MAX_THREADS_PROCESSES[SCALABILITY_ANALYSIS],
+                get_model_name(INPUT_DATA),
+                PERIOD,
+            )
         else:
             pass
 
     else:
         print(
-            "Data set already available. Move, rename or delete to create a new dataset."
+            "Records already available. Move, rename or delete to create a new dataset."
         )
 
     if PATH_AUXINPUT_PARAMS.exists():
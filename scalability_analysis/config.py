@@ -3,8 +3,23 @@ from pathlib import Path
 
 ITERATIONS = {"threads": 1_000, "processes": 1_000}
 
+# Untimed iterations to exclude the compilation of numba functions.
+WARMUP = {"threads": 5, "processes": 5}
+
 MAX_THREADS_PROCESSES = {"threads": 12, "processes": 12}
 
+# MPI launcher and types of scaling for the analysis of processes, see
+# mpi_scalability.py. Weak scaling holds the number of rows per rank constant.
+MPIEXEC = "mpiexec"
+# @["mpiexec", "mpiexec.hydra"]
+MPI_SCALING = ["strong", "weak"]
+ROWS_PER_RANK = 1_000
+
+# Iterate through the number of threads within a single process instead of
+# starting a new interpreter for each number of threads. Requires numba>=0.49,
+# otherwise a new interpreter is started regardless.
+THREADS_IN_PROCESS = True
+
 INPUT_DATA = Path("./resources/raw_input_data/kw_94_one_input_params.pickle")
 # @[
 #   Path("./resources/raw_input_data/kw_94_one_input_params.pickle")
@@ -12,7 +27,11 @@ INPUT_DATA = Path("./resources/raw_input_data/kw_94_one_input_params.pickle")
 #   Path("./resources/raw_input_data/kw_97_basic_two_input_params.pickle")
 # ]
 DATA_FORMAT = "pickle"
-# @["pickle", "npy"]
+# @["pickle", "npy", "mmap"]
+# "mmap" converts INPUT_DATA once into plain arrays per period (see input_data.py),
+# which are memory-mapped by the workers instead of unpickling a sliced copy.
+MMAP_MODE = "r"
+# @["r", "c"]
 
 PERIOD = "per28"
 # @["per1", "per8", "per18", "per28", "per38"] for "kw_94_one_input_params.pickle"
@@ -20,3 +39,34 @@ PERIOD = "per28"
 # @["per1", "per8", "per18", "per28", "per38", "per48"]
 # for "kw_97_basic_two_input_params.pickle"
 # @["per1", "per8", "per18", "per28", "per38", "per48"]
+
+# Models and periods that are iterated through with "caller_scalability_analysis.py
+# matrix", in the format key = input file, value = list of periods.
+SCALABILITY_MATRIX = {
+    Path("./resources/raw_input_data/kw_94_one_input_params.pickle"): [
+        "per1",
+        "per8",
+        "per18",
+        "per28",
+        "per38",
+    ],
+    Path("./resources/raw_input_data/kw_97_basic_one_input_params.pickle"): [
+        "per1",
+        "per8",
+        "per18",
+        "per28",
+        "per38",
+        "per48",
+    ],
+    Path("./resources/raw_input_data/kw_97_basic_two_input_params.pickle"): [
+        "per1",
+        "per8",
+        "per18",
+        "per28",
+        "per38",
+        "per48",
+    ],
+}
+
+# Number of threads / processes past which the scaling of each period is reported.
+SCALING_WORKERS = 4
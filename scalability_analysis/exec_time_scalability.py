@@ -23,52 +23,39 @@ if SCALABILITY_ANALYSIS == "threads":
     print("Number of threads:", num_threads, ".")
     os.environ.update(update_)
 
-import datetime
-import pickle
 import pandas as pd
+from benchmark_solution import benchmark_full_solution
+from config import DATA_FORMAT
+from config import INPUT_DATA
 from config import ITERATIONS
-from config import MAX_THREADS_PROCESSES
+from config import MMAP_MODE
 from config import PERIOD
+from config import WARMUP
 from caller_scalability_analysis import PATH_AUXINPUT_PARAMS
 from caller_scalability_analysis import SCALABILITY_ANALYSIS
-from respy.solve import _full_solution
+from input_data import load_period
+from results_store import get_model_name
+from results_store import write_record
 
 
 if __name__ == "__main__":
 
-    if SCALABILITY_ANALYSIS == "processes" and len(sys.argv) > 1:
-        num_processes = int(sys.argv[1])
+    # Model and period of the input parameters, default from config.py.
+    model = sys.argv[2] if len(sys.argv) > 2 else get_model_name(INPUT_DATA)
+    period = sys.argv[3] if len(sys.argv) > 3 else PERIOD
 
-    input_params = pickle.load(open(PATH_AUXINPUT_PARAMS, "rb"))
-
-    times = []
-    for _j in range(ITERATIONS[SCALABILITY_ANALYSIS]):
-
-        start = datetime.datetime.now()
-        calc = _full_solution(
-            input_params["wages"],
-            input_params["nonpecs"],
-            input_params["continuation_values"],
-            input_params["period_draws_emax_risk"],
-            input_params["optim_paras"],
-        )
-        end = datetime.datetime.now()
-        print("Iteration", _j)
-
-        times.append((end - start).microseconds)
-
-    df_times = pd.DataFrame(times, columns=[f"{num_threads}"])
-
-    number = MAX_THREADS_PROCESSES[SCALABILITY_ANALYSIS]
-    if int(num_threads) > 1:
-        (
-            pd.read_pickle(
-                f"./resources/times_df_{number}{SCALABILITY_ANALYSIS}_{PERIOD}.pickle"
-            ).join(df_times, lsuffix="_")
-        ).to_pickle(
-            f"./resources/times_df_{number}{SCALABILITY_ANALYSIS}_{PERIOD}.pickle"
-        )
+    if DATA_FORMAT == "mmap":
+        input_params = load_period(model, period, MMAP_MODE)
     else:
-        df_times.to_pickle(
-            f"./resources/times_df_{number}{SCALABILITY_ANALYSIS}_{PERIOD}.pickle"
-        )
+        input_params = pd.read_pickle(PATH_AUXINPUT_PARAMS)
+
+    df_results = benchmark_full_solution(
+        input_params,
+        ITERATIONS[SCALABILITY_ANALYSIS],
+        WARMUP[SCALABILITY_ANALYSIS],
+        model=model,
+        period=period,
+        **{SCALABILITY_ANALYSIS: int(num_threads)},
+    )
+
+    write_record(df_results, SCALABILITY_ANALYSIS)
@@ -0,0 +1,160 @@
+"""Conversion of the input parameter bundles into memory-mapped arrays per period.
+
+The bundles in ./resources/raw_input_data are pickled dictionaries with the input
+parameters of all periods. The converted data holds one plain .npy file per array
+and period, such that a worker maps only the period it needs into memory.
+
+    ./resources/input_data/{model}/{period}/{array}.npy
+    ./resources/input_data/{model}/{period}/metadata.pickle
+"""
+import pickle
+import sys
+from pathlib import Path
+
+import numpy as np
+from config import INPUT_DATA
+from config import SCALABILITY_MATRIX
+from results_store import get_model_name
+
+PATH_INPUT_DATA = Path("./resources/input_data")
+
+ARRAYS = ["wages", "nonpecs", "continuation_values", "period_draws_emax_risk"]
+
+
+def read_input_bundle(input_data):
+    """Read a bundle of input parameters stored as .pickle or .npy file.
+
+    Parameters:
+    -----------
+    input_data: Path
+        Path of the bundle, e.g. ./resources/raw_input_data/kw_94_one_input_params.npy
+
+    Returns:
+    --------
+    input_params_all: dict
+        Dictionary in the format key = period, value = input parameters.
+
+    """
+    if input_data.suffix == ".npy":
+        return np.load(input_data, allow_pickle=True).item()
+    else:
+        return pickle.load(open(input_data, "rb"))
+
+
+def write_period(input_params, path_period):
+    """Write the input parameters of a period as plain arrays and metadata.
+
+    The arrays are stored as .npy files without pickled objects. The remaining
+    model parameters, ``optim_paras``, are a small nested dictionary of pandas
+    objects and are kept as metadata.
+
+    Parameters:
+    -----------
+    input_params: dict
+        Input parameters of a period.
+    path_period: Path
+        Output directory of the period.
+
+    """
+    path_period.mkdir(parents=True, exist_ok=True)
+
+    for array in ARRAYS:
+        np.save(path_period / f"{array}.npy", np.ascontiguousarray(input_params[array]))
+
+    metadata = {
+        "optim_paras": input_params["optim_paras"],
+        "shapes": {array: input_params[array].shape for array in ARRAYS},
+    }
+    pickle.dump(metadata, open(path_period / "metadata.pickle", "wb"))
+
+
+def convert_input_bundle(input_data, path_out=PATH_INPUT_DATA):
+    """Convert a bundle of input parameters into arrays per period.
+
+    Parameters:
+    -----------
+    input_data: Path
+        Path of the bundle, e.g. ./resources/raw_input_data/kw_94_one_input_params.npy
+    path_out: Path
+        Output directory of the converted data.
+
+    """
+    model = get_model_name(input_data)
+
+    for period, input_params in read_input_bundle(input_data).items():
+        write_period(input_params, Path(path_out) / model / period)
+
+
+def convert_raw_input_data(path_in, model, periods, path_out=PATH_INPUT_DATA):
+    """Convert the raw input parameters of single periods into arrays per period.
+
+    Parameters:
+    -----------
+    path_in: Path
+        Directory of the raw files inputs_{model}_per{period}.pickle.
+    model: str
+        Model of the input parameters, e.g. "kw_94_one".
+    periods: list
+        Periods to convert, e.g. [1, 8, 18, 28, 38].
+    path_out: Path
+        Output directory of the converted data.
+
+    """
+    for period in periods:
+        infile = np.load(
+            Path(path_in) / f"inputs_{model}_per{period}.pickle", allow_pickle=True
+        )
+        write_period(infile, Path(path_out) / model / f"per{period}")
+
+
+def has_period(model, period, path_out=PATH_INPUT_DATA):
+    """Check whether the converted input parameters of a period exist."""
+    return (Path(path_out) / model / period / "metadata.pickle").exists()
+
+
+def load_period(model, period, mmap_mode="r", path_out=PATH_INPUT_DATA):
+    """Load the input parameters of a period without copying the arrays.
+
+    Parameters:
+    -----------
+    model: str
+        Model of the input parameters, e.g. "kw_94_one".
+    period: str
+        Period of the input parameters, e.g. "per28".
+    mmap_mode: str
+        Mode of ``np.load``, "r" (read-only) or "c" (copy-on-write).
+    path_out: Path
+        Directory of the converted data.
+
+    Returns:
+    --------
+    input_params: dict
+        Input parameters of the period with memory-mapped arrays.
+
+    """
+    path_period = Path(path_out) / model / period
+
+    input_params = {
+        array: np.load(path_period / f"{array}.npy", mmap_mode=mmap_mode)
+        for array in ARRAYS
+    }
+    input_params["optim_paras"] = pickle.load(
+        open(path_period / "metadata.pickle", "rb")
+    )["optim_paras"]
+
+    return input_params
+
+
+if __name__ == "__main__":
+
+    # Convert a given bundle or all bundles used in config.py.
+    if len(sys.argv) > 1:
+        bundles = [Path(sys.argv[1])]
+    else:
+        bundles = [INPUT_DATA, *SCALABILITY_MATRIX.keys()]
+
+    for input_data in dict.fromkeys(bundles):
+        if input_data.exists():
+            convert_input_bundle(input_data)
+        else:
+            print(f"Input data {input_data} not available.")
@@ -0,0 +1,205 @@
+"""Strong and weak scaling of the full solution with MPI.
+
+The rows (states) of a period are scattered over the ranks, solved and gathered
+on the root. Each iteration starts and ends with a barrier, such that the timings
+cover the slowest rank including the communication.
+
+    mpiexec -n N python mpi_scalability.py {strong, weak} [model] [period]
+
+Strong scaling solves the full period with any number of ranks. Weak scaling
+holds the number of rows per rank constant (ROWS_PER_RANK in config.py) by
+repeating the rows of the period.
+"""
+import os
+import sys
+
+# Ranks do not use threads themselves.
+parallel_off = {
+    "NUMBA_NUM_THREADS": "1",
+    "OMP_NUM_THREADS": "1",
+    "OPENBLAS_NUM_THREADS": "1",
+    "NUMEXPR_NUM_THREADS": "1",
+    "MKL_NUM_THREADS": "1",
+}
+os.environ.update(parallel_off)
+
+import time
+
+import numpy as np
+import pandas as pd
+from benchmark_solution import get_results_table
+from benchmark_solution import run_full_solution
+from caller_scalability_analysis import PATH_AUXINPUT_PARAMS
+from config import DATA_FORMAT
+from config import INPUT_DATA
+from config import ITERATIONS
+from config import MMAP_MODE
+from config import PERIOD
+from config import ROWS_PER_RANK
+from config import WARMUP
+from input_data import load_period
+from mpi4py import MPI
+from results_store import get_model_name
+from results_store import write_record
+
+ROW_ARRAYS = ["wages", "nonpecs", "continuation_values"]
+
+
+def get_row_chunks(input_params, num_ranks, scaling, rows_per_rank):
+    """Split the rows of a period into one chunk per rank.
+
+    Parameters:
+    -----------
+    input_params: dict
+        Input parameters of the period.
+    num_ranks: int
+        Number of MPI ranks.
+    scaling: str
+        "strong" splits the period, "weak" uses ``rows_per_rank`` rows per rank.
+    rows_per_rank: int
+        Number of rows per rank for weak scaling.
+
+    Returns:
+    --------
+    chunks: list
+        List with a dictionary of row arrays for each rank.
+
+    """
+    arrays = {array: np.asarray(input_params[array]) for array in ROW_ARRAYS}
+
+    if scaling == "weak":
+        num_rows = arrays["wages"].shape[0]
+        index = np.arange(rows_per_rank * num_ranks) % num_rows
+        arrays = {array: values[index] for array, values in arrays.items()}
+
+    splits = {
+        array: np.array_split(values, num_ranks) for array, values in arrays.items()
+    }
+    chunks = [
+        {array: splits[array][rank] for array in ROW_ARRAYS}
+        for rank in range(num_ranks)
+    ]
+
+    return chunks
+
+
+def solve_distributed(comm, chunks, shared_params):
+    """Scatter the rows, solve them on every rank and gather the results.
+
+    Returns:
+    --------
+    emax: np.ndarray or None
+        Solution of all rows on the root, None on the other ranks.
+    compute_ns: int
+        Time of the local solution in nanoseconds.
+
+    """
+    input_params = {**comm.scatter(chunks, root=0), **shared_params}
+
+    start = time.perf_counter_ns()
+    emax_local = run_full_solution(input_params)
+    compute_ns = time.perf_counter_ns() - start
+
+    emax = comm.gather(emax_local, root=0)
+    if comm.Get_rank() == 0:
+        emax = np.concatenate(emax)
+
+    return emax, compute_ns
+
+
+def time_distributed(comm, input_params, scaling, iterations, warmup, rows_per_rank):
+    """Time the distributed solution with barrier-synchronized timers.
+
+    Parameters:
+    -----------
+    comm: MPI.Comm
+        Communicator of all ranks.
+    input_params: dict or None
+        Input parameters of the period, only required on the root.
+    scaling: str
+        Type of scaling: "strong" or "weak".
+    iterations: int
+        Number of timed solutions.
+    warmup: int
+        Number of untimed solutions, e.g. to exclude numba compilation.
+    rows_per_rank: int
+        Number of rows per rank for weak scaling.
+
+    Returns:
+    --------
+    df_results: pd.DataFrame or None
+        Tidy results table with the wall time ("time_ns") and the compute time of
+        the slowest rank ("compute_ns") on the root, None on the other ranks.
+
+    """
+    rank, num_ranks = comm.Get_rank(), comm.Get_size()
+
+    chunks, shared_params = None, None
+    if rank == 0:
+        chunks = get_row_chunks(input_params, num_ranks, scaling, rows_per_rank)
+        shared_params = {
+            "period_draws_emax_risk": np.asarray(
+                input_params["period_draws_emax_risk"]
+            ),
+            "optim_paras": input_params["optim_paras"],
+        }
+    shared_params = comm.bcast(shared_params, root=0)
+
+    times = np.empty(iterations, dtype=np.int64)
+    compute_times = np.empty(iterations, dtype=np.int64)
+    for j in range(warmup + iterations):
+        comm.Barrier()
+        start = time.perf_counter_ns()
+
+        _, compute_ns = solve_distributed(comm, chunks, shared_params)
+
+        comm.Barrier()
+        elapsed = time.perf_counter_ns() - start
+
+        compute_ns = comm.reduce(compute_ns, op=MPI.MAX, root=0)
+        if j >= warmup:
+            times[j - warmup] = elapsed
+            compute_times[j - warmup] = compute_ns if rank == 0 else 0
+
+    if rank != 0:
+        return None
+
+    df_results = get_results_table(
+        times,
+        processes=num_ranks,
+        scaling=scaling,
+        num_states=sum(chunk["wages"].shape[0] for chunk in chunks),
+    )
+    df_results["compute_ns"] = compute_times
+
+    return df_results
+
+
+if __name__ == "__main__":
+
+    comm = MPI.COMM_WORLD
+
+    scaling = sys.argv[1] if len(sys.argv) > 1 else "strong"
+    model = sys.argv[2] if len(sys.argv) > 2 else get_model_name(INPUT_DATA)
+    period = sys.argv[3] if len(sys.argv) > 3 else PERIOD
+
+    input_params = None
+    if comm.Get_rank() == 0:
+        if DATA_FORMAT == "mmap":
+            input_params = load_period(model, period, MMAP_MODE)
+        else:
+            input_params = pd.read_pickle(PATH_AUXINPUT_PARAMS)
+
+    df_results = time_distributed(
+        comm,
+        input_params,
+        scaling,
+        ITERATIONS["processes"],
+        WARMUP["processes"],
+        ROWS_PER_RANK,
+    )
+
+    if comm.Get_rank() == 0:
+        df_results.insert(0, "period", period)
+        df_results.insert(0, "model", model)
+        write_record(df_results, "processes")
@@ -2,15 +2,20 @@
 import sys
 
 import matplotlib.pyplot as plt
-import pandas as pd
 from caller_scalability_analysis import SCALABILITY_ANALYSIS
+from config import INPUT_DATA
 from config import MAX_THREADS_PROCESSES
 from config import PERIOD
 from matplotlib.ticker import FuncFormatter
 from matplotlib.ticker import MaxNLocator
+from results_store import get_model_name
+from results_store import load_results
+from results_store import select_scaling
+from results_store import summarize_results
+from solve_profiler import get_period_profile
 
 
-def plot_time(processes_threads, max_processes_threads, period=""):
+def plot_time(processes_threads, max_processes_threads, period="*", model="*"):
     """Illustration of execution time to available threads / processes.
 
     Parameters:
@@ -19,6 +24,10 @@ def plot_time(processes_threads, max_processes_threads, period=""):
         Type of scalability analysis to perform: processes or threads.
     max_processes_threads: int
         Maximum number of available (used) processes or threads set in config.py.
+    period: str
+        Period of the input parameters, e.g. "per28".
+    model: str
+        Model of the input parameters, e.g. "kw_94_one".
 
     Returns:
     --------
@@ -26,19 +35,21 @@ def plot_time(processes_threads, max_processes_threads, period=""):
         Figure saved in ./resources as .pdf.
 
     """
-    times_df = pd.read_pickle(
-        f"./resources/times_df_{max_processes_threads}{processes_threads}_{period}.pickle"
+    df_results = select_scaling(
+        load_results(model, period, processes_threads), "strong"
     )
 
-    # Exclude first time measurement due to numba "burn-in".
-    ys = [*times_df.iloc[:1].mean()]
-    xs = [*range(1, max_processes_threads + 1)]
+    # Compilation of numba functions is excluded by the warmup iterations.
+    summary = summarize_results(df_results, [processes_threads])
+    summary = summary[["median_ns", "q25_ns", "q75_ns"]] / 1_000
+    xs = summary.index.to_numpy()
 
     fig, ax = plt.subplots(1, 1)
-    ax.plot(xs, ys)
+    ax.plot(xs, summary["median_ns"])
+    ax.fill_between(xs, summary["q25_ns"], summary["q75_ns"], alpha=0.3)
 
     ax.set_xlabel(f"Number of {processes_threads}")
-    ax.set_ylabel("Microseconds")
+    ax.set_ylabel("Microseconds (median)")
     ax.xaxis.set_major_locator(MaxNLocator(integer=True))
     ax.get_yaxis().set_major_formatter(FuncFormatter(lambda x, p: format(int(x), ",")))
 
@@ -52,6 +63,51 @@ def plot_time(processes_threads, max_processes_threads, period=""):
         )
 
 
+def plot_profile(model="*", label="*"):
+    """Illustration of the execution time of each period split into stages.
+
+    Parameters:
+    -----------
+    model: str
+        Model of the profile, e.g. "kw_94_one".
+    label: str
+        Label of the profile as passed to solve_profiler.py, "*" selects all.
+
+    Returns:
+    --------
+    figure_profile_{model}: fig
+        Figure saved in ./resources as .pdf.
+
+    """
+    df_profile = load_results(model, "all", "profile")
+    if label != "*":
+        df_profile = df_profile[df_profile["profile"] == label]
+
+    df_period = get_period_profile(df_profile) / 1_000
+
+    fig, ax = plt.subplots(1, 1)
+    df_period.plot.bar(stacked=True, ax=ax, width=0.9)
+
+    ax.set_xlabel("Period")
+    ax.set_ylabel("Microseconds (mean per solution)")
+    ax.set_xticks(range(0, len(df_period), 5))
+    ax.set_xticklabels(df_period.index[::5].astype(int), rotation="horizontal")
+    ax.get_yaxis().set_major_formatter(FuncFormatter(lambda x, p: format(int(x), ",")))
+
+    if len(sys.argv) > 1 and sys.argv[1] == "show":
+        plt.show()
+    else:
+        fig.savefig(f"./resources/figure_profile_{model}.pdf", bbox_inches="tight")
+
+
 if __name__ == "__main__":
 
-    plot_time(SCALABILITY_ANALYSIS, MAX_THREADS_PROCESSES[SCALABILITY_ANALYSIS], PERIOD)
+    if "profile" in sys.argv[1:]:
+        plot_profile(get_model_name(INPUT_DATA))
+    else:
+        plot_time(
+            SCALABILITY_ANALYSIS,
+            MAX_THREADS_PROCESSES[SCALABILITY_ANALYSIS],
+            PERIOD,
+            get_model_name(INPUT_DATA),
+        )
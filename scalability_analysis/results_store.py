@@ -0,0 +1,203 @@
+"""Append-only store for the results of the scalability analysis.
+
+Each run writes its own record, such that runs may overlap or happen on different
+machines. The records are only assembled when they are read.
+"""
+import datetime
+import os
+import socket
+from pathlib import Path
+
+import pandas as pd
+
+PATH_RESULTS = Path("./resources/results")
+
+
+def get_model_name(input_data):
+    """Name of the model of an input file, e.g. "kw_94_one"."""
+    return input_data.stem.replace("_input_params", "")
+
+
+def get_record_pattern(model="*", period="*", kind="*", number="*"):
+    """Glob pattern of the records of a model, period, kind of analysis and number of
+    threads or processes."""
+    return f"{model}_{period}_{kind}{number}_*.pickle"
+
+
+def write_record(df_results, kind, path_results=PATH_RESULTS):
+    """Write the results of a single run as separate record.
+
+    Parameters:
+    -----------
+    df_results: pd.DataFrame
+        Tidy results table with the columns "model", "period" and ``kind``.
+    kind: str
+        Type of scalability analysis: threads or processes.
+    path_results: Path
+        Directory of the records.
+
+    Returns:
+    --------
+    path_record: Path
+        Path of the written record.
+
+    """
+    host = socket.gethostname()
+    timestamp = datetime.datetime.utcnow()
+
+    df_record = df_results.assign(host=host, timestamp=timestamp)
+
+    model, period, number = df_record[["model", "period", kind]].iloc[0]
+    path_record = Path(path_results) / (
+        f"{model}_{period}_{kind}{number}_{host}_"
+        f"{timestamp:%Y%m%dT%H%M%S%f}_{os.getpid()}.pickle"
+    )
+    path_record.parent.mkdir(parents=True, exist_ok=True)
+
+    # Records appear only once they are complete.
+    path_tmp = path_record.with_suffix(".tmp")
+    df_record.to_pickle(path_tmp)
+    os.replace(path_tmp, path_record)
+
+    return path_record
+
+
+def has_records(
+    model="*", period="*", kind="*", number="*", scaling=None, path_results=PATH_RESULTS
+):
+    """Check whether any records exist for a model, period, kind of analysis and number
+    of threads or processes.
+
+    With ``scaling`` only records of that type of scaling ("strong" or "weak") are
+    considered, see ``select_scaling``.
+    """
+    paths = Path(path_results).glob(get_record_pattern(model, period, kind, number))
+
+    if scaling is None:
+        return any(paths)
+
+    return any(len(select_scaling(pd.read_pickle(path), scaling)) for path in paths)
+
+
+def load_results(model="*", period="*", kind="*", path_results=PATH_RESULTS):
+    """Assemble the records of a model, period and kind of analysis.
+
+    Parameters:
+    -----------
+    model, period, kind: str
+        Selection of the records, "*" selects all.
+    path_results: Path
+        Directory of the records.
+
+    Returns:
+    --------
+    df_results: pd.DataFrame
+        Tidy results table of all selected records.
+
+    """
+    pattern = get_record_pattern(model, period, kind)
+    records = [
+        pd.read_pickle(path) for path in sorted(Path(path_results).glob(pattern))
+    ]
+
+    if not records:
+        raise FileNotFoundError(f"No records {pattern} in {path_results}.")
+
+    return pd.concat(records, ignore_index=True, sort=False)
+
+
+def select_scaling(df_results, scaling):
+    """Select the results of a type of scaling ("strong" or "weak").
+
+    Results without information on the scaling, e.g. of threads, are strong
+    scaling results as the problem size is fixed.
+    """
+    if "scaling" not in df_results.columns:
+        return df_results if scaling == "strong" else df_results.iloc[:0]
+
+    return df_results[df_results["scaling"].fillna("strong") == scaling]
+
+
+def summarize_results(df_results, by):
+    """Summarize a tidy results table.
+
+    Parameters:
+    -----------
+    df_results: pd.DataFrame
+        Tidy results table, e.g. as returned by ``load_results``.
+    by: list
+        Label columns to group by, e.g. ["model", "period", "threads"].
+
+    Returns:
+    --------
+    summary: pd.DataFrame
+        Median, quartiles, interquartile range and minimum in nanoseconds as
+        well as the throughput in solved states per second if "num_states" is
+        available.
+
+    """
+    grouped = df_results.groupby(by)["time_ns"]
+
+    summary = pd.DataFrame(
+        {
+            "median_ns": grouped.median(),
+            "q25_ns": grouped.quantile(0.25),
+            "q75_ns": grouped.quantile(0.75),
+            "min_ns": grouped.min(),
+            "iterations": grouped.size(),
+        }
+    )
+
+    summary["iqr_ns"] = summary["q75_ns"] - summary["q25_ns"]
+
+    if "num_states" in df_results.columns:
+        num_states = df_results.groupby(by)["num_states"].first()
+        summary["states_per_second"] = num_states * 1e9 / summary["median_ns"]
+
+    return summary
+
+
+def get_scaling_report(df_results, kind, num_workers, min_gain=0.05):
+    """Report which periods stop scaling past a number of threads or processes.
+
+    Parameters:
+    -----------
+    df_results: pd.DataFrame
+        Tidy results table of several models and periods.
+    kind: str
+        Type of scalability analysis: threads or processes.
+    num_workers: int
+        Number of threads or processes past which the scaling is evaluated.
+    min_gain: float
+        Minimum relative speedup past ``num_workers`` that counts as scaling.
+
+    Returns:
+    --------
+    report: pd.DataFrame
+        Speedup relative to the smallest number of workers for each model and
+        period, sorted by the number of states.
+
+    """
+    summary = summarize_results(df_results, ["model", "period", kind])
+    num_states = df_results.groupby(["model", "period"])["num_states"].first()
+
+    report = {}
+    for (model, period), df in summary.groupby(level=["model", "period"]):
+        median = df["median_ns"].droplevel(["model", "period"]).sort_index()
+        speedup = median.iloc[0] / median
+
+        speedup_workers = speedup[speedup.index <= num_workers].max()
+        speedup_past = speedup[speedup.index > num_workers].max()
+
+        report[(model, period)] = {
+            "num_states": num_states[(model, period)],
+            f"speedup_{num_workers}": speedup_workers,
+            "speedup_max": speedup.max(),
+            f"{kind}_max": speedup.idxmax(),
+            "stops_scaling": not speedup_past > speedup_workers * (1 + min_gain),
+        }
+
+    report = pd.DataFrame.from_dict(report, orient="index")
+    report.index.names = ["model", "period"]
+
+    return report.sort_values("num_states")
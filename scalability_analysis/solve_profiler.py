@@ -0,0 +1,284 @@
+"""Opt-in profiler of the solution of respy per period and stage.
+
+The profiler replaces the functions in HOOKS within all loaded respy modules by
+timed wrappers while it is active and restores them afterwards. Without an active
+profiler nothing is patched, such that the instrumentation costs nothing. Hooks
+that are not available in the installed version of respy are skipped with a
+warning.
+
+    with SolveProfiler() as profiler:
+        simulate_func = rp.get_simulate_func(params, options)
+        simulate_func(params)
+
+    df_profile = profiler.to_frame()
+
+Alternatively, ``get_profiler`` returns a profiler only if the environment
+variable RESPY_PROFILE is set ("1", or "memory" to trace allocations as well).
+The profile of an example model is stored in the results store with
+
+    python solve_profiler.py [model] [label]
+"""
+import contextlib
+import functools
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+import pandas as pd
+from results_store import write_record
+
+sys.path.insert(0, f"{os.environ['PROJECT_ROOT']}/python")
+
+from auxfunc_hooks import get_function
+from auxfunc_hooks import patch_function
+
+PROFILE_ENV = "RESPY_PROFILE"
+
+# Functions of respy that are timed, in the format key = stage, value = function.
+HOOKS = {
+    "solve": "respy.solve.solve",
+    "backward_induction": "respy.solve.solve_with_backward_induction",
+    "emax": "respy.solve._full_solution",
+}
+
+# Stage that is called once per period during the backward induction. The time
+# between two calls within the same parent is recorded as stage "setup".
+PERIOD_STAGE = "emax"
+
+
+def get_num_states(args):
+    """Number of states, i.e. rows of the first array among the arguments."""
+    for arg in args:
+        if isinstance(arg, np.ndarray) and arg.ndim > 0:
+            return arg.shape[0]
+
+    return np.nan
+
+
+class SolveProfiler:
+    """Record the wall time, states and allocations of each stage of a solution.
+
+    Parameters:
+    -----------
+    hooks: dict
+        Functions to time in the format key = stage, value = function - default
+        HOOKS.
+    trace_allocations: bool
+        Record the net allocated memory of each call with ``tracemalloc``, which
+        slows down the solution considerably.
+
+    """
+
+    def __init__(self, hooks=None, trace_allocations=False):
+        self.hooks = HOOKS if hooks is None else hooks
+        self.trace_allocations = trace_allocations
+        self.records = []
+        self.stack = []
+        self.patches = contextlib.ExitStack()
+
+    def __enter__(self):
+        if self.trace_allocations:
+            tracemalloc.start()
+
+        for stage, function in self.hooks.items():
+            self.patch(stage, function)
+
+        return self
+
+    def __exit__(self, *args):
+        self.patches.close()
+
+        if self.trace_allocations:
+            tracemalloc.stop()
+
+    def patch(self, stage, function):
+        """Replace a function by a timed wrapper in all modules of its package."""
+        try:
+            func = get_function(function)
+        except (ImportError, AttributeError):
+            warnings.warn(f"{function} is not available, stage {stage} is skipped.")
+            return
+
+        self.patches.enter_context(patch_function(func, self.wrap(stage, func)))
+
+    def wrap(self, stage, func):
+        """Timed wrapper of a function."""
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.stage(stage, num_states=get_num_states(args)):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    @contextlib.contextmanager
+    def stage(self, stage, **info):
+        """Time a stage, e.g. ``get_simulate_func``, including all nested stages."""
+        record = {
+            "id": len(self.records),
+            "parent": self.stack[-1] if self.stack else -1,
+            "stage": stage,
+            **info,
+        }
+        self.records.append(record)
+        self.stack.append(record["id"])
+
+        if self.trace_allocations:
+            memory_start = tracemalloc.get_traced_memory()[0]
+        record["start_ns"] = time.perf_counter_ns()
+        try:
+            yield record
+        finally:
+            record["time_ns"] = time.perf_counter_ns() - record["start_ns"]
+            if self.trace_allocations:
+                record["memory_bytes"] = (
+                    tracemalloc.get_traced_memory()[0] - memory_start
+                )
+            self.stack.pop()
+
+    def to_frame(self):
+        """Profile as tidy table, see ``get_profile_table``."""
+        return get_profile_table(pd.DataFrame(self.records))
+
+
+def get_profile_table(df_records):
+    """Tidy table of the recorded stages with their period and exclusive time.
+
+    The calls of PERIOD_STAGE within a parent are assigned to the periods in
+    reversed order (backward induction with a full solution in each period).
+    Nested stages inherit the period of their parent. The time before each call
+    of PERIOD_STAGE, e.g. to set up the arrays of the period, is added as stage
+    "setup".
+
+    Returns:
+    --------
+    df_profile: pd.DataFrame
+        Table with the columns "stage", "parent", "solution_period", "time_ns"
+        (including nested stages), "self_ns" (excluding nested stages),
+        "num_states" and, if traced, "memory_bytes".
+
+    """
+    df = df_records.set_index("id")
+    df["end_ns"] = df["start_ns"] + df["time_ns"]
+
+    is_period = df["stage"] == PERIOD_STAGE
+    df["solution_period"] = np.nan
+    df.loc[is_period, "solution_period"] = (
+        df[is_period].groupby("parent").cumcount(ascending=False)
+    )
+    for _ in range(len(df)):
+        inherited = df["parent"].map(df["solution_period"])
+        if not (df["solution_period"].isna() & inherited.notna()).any():
+            break
+        df["solution_period"] = df["solution_period"].fillna(inherited)
+
+    df["self_ns"] = df["time_ns"] - df.groupby("parent")["time_ns"].sum().reindex(
+        df.index, fill_value=0
+    )
+
+    # Time between a period and its predecessor (or the start of the parent).
+    df_period = df[is_period].sort_values("start_ns")
+    previous_end = df_period.groupby("parent")["end_ns"].shift()
+    previous_end = previous_end.fillna(df_period["parent"].map(df["start_ns"]))
+    df_setup = pd.DataFrame(
+        {
+            "stage": "setup",
+            "parent": df_period["parent"],
+            "solution_period": df_period["solution_period"],
+            "time_ns": df_period["start_ns"] - previous_end,
+        }
+    ).dropna(subset=["time_ns"])
+    df_setup["self_ns"] = df_setup["time_ns"]
+
+    df = df.drop(columns=["start_ns", "end_ns"]).reset_index()
+    df_profile = pd.concat([df, df_setup.reset_index(drop=True)], sort=False)
+
+    return df_profile.reset_index(drop=True)
+
+
+def get_period_profile(df_profile):
+    """Average exclusive time per period and stage over all solutions.
+
+    Solutions are identified by their parent stage within each record.
+
+    Returns:
+    --------
+    df_period: pd.DataFrame
+        Table with one row per period and one column per stage in nanoseconds.
+
+    """
+    df = df_profile.dropna(subset=["solution_period"])
+    solution = [column for column in ["host", "timestamp"] if column in df.columns]
+
+    df_solution = df.groupby(solution + ["parent", "solution_period", "stage"])[
+        "self_ns"
+    ].sum()
+
+    return (
+        df_solution.groupby(["solution_period", "stage"]).mean().unstack(fill_value=0)
+    )
+
+
+def get_profiler(trace_allocations=None):
+    """Profiler if the environment variable RESPY_PROFILE is set.
+
+    Returns:
+    --------
+    profiler: SolveProfiler or contextlib.nullcontext
+        Context manager, which does nothing if profiling is disabled.
+
+    """
+    flag = os.environ.get(PROFILE_ENV, "")
+    if flag in ["", "0"]:
+        return contextlib.nullcontext()
+
+    if trace_allocations is None:
+        trace_allocations = flag == "memory"
+
+    return SolveProfiler(trace_allocations=trace_allocations)
+
+
+def profile_example_model(model, trace_allocations=False):
+    """Profile the simulation and the likelihood of an example model of respy.
+
+    Returns:
+    --------
+    df_profile: pd.DataFrame
+        Profile as returned by ``get_profile_table``.
+
+    """
+    import respy as rp
+    from respy.likelihood import get_crit_func
+
+    params, options = rp.get_example_model(model, with_data=False)
+    params.loc[("eta", "eta"), "value"] = 0.00
+
+    with SolveProfiler(trace_allocations=trace_allocations) as profiler:
+        with profiler.stage("get_simulate_func"):
+            simulate_func = rp.get_simulate_func(params, options)
+        with profiler.stage("simulate"):
+            df = simulate_func(params)
+        with profiler.stage("get_crit_func"):
+            crit_func = get_crit_func(params, options, df)
+        with profiler.stage("crit_func"):
+            crit_func(params)
+
+    return profiler.to_frame()
+
+
+if __name__ == "__main__":
+
+    model = sys.argv[1] if len(sys.argv) > 1 else "kw_94_one"
+    label = sys.argv[2] if len(sys.argv) > 2 else "example"
+
+    df_profile = profile_example_model(
+        model, os.environ.get(PROFILE_ENV, "") == "memory"
+    )
+    df_profile.insert(0, "profile", label)
+
+    write_record(df_profile.assign(model=model, period="all"), "profile")
+
+    print(get_period_profile(df_profile) / 1e6)
@@ -9,19 +9,30 @@ NOTEBOOKS_ROOT = os.environ["PROJECT_ROOT"] + "/notebooks"
 
 def parse_arguments(description):
     """This function parses the arguments for the scripts."""
+    args = get_parser(description).parse_args()
+
+    return get_request(args.name)
+
+
+def get_parser(description):
+    """This function returns the argument parser shared by the scripts, such that a script
+    can add its own arguments."""
     parser = argparse.ArgumentParser(description=description)
 
     parser.add_argument(
         "-n", "--name", type=str, help="name of notebook", default="all", dest="name"
     )
 
-    args = parser.parse_args()
+    return parser
+
 
+def get_request(name):
+    """This function returns the list of notebooks matching the requested name."""
     # We can either request a single lecture or just act on all of them. We use string matching
     # to ease workflow.
-    if args.name != "all":
+    if name != "all":
         request = difflib.get_close_matches(
-            args.name, get_list_of_notebooks(), n=1, cutoff=0.1
+            name, get_list_of_notebooks(), n=1, cutoff=0.1
         )
         if not request:
             raise AssertionError("unable to match notebook")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""This script generates the reference log-likelihood values of random models for
+tests/test_log_likelihood.py. The models are simulated and evaluated in parallel."""
+import argparse
+import multiprocessing as mp
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from respy.likelihood import get_crit_func
+from respy.simulate import get_simulate_func
+from respy.tests.random_model import generate_random_model
+
+sys.path.insert(0, f"{os.environ['PROJECT_ROOT']}/tests")
+from reference_store import write_loglikes  # noqa: E402
+from reference_store import write_model  # noqa: E402
+
+# Do not change path: Ensures that "old" test files are never overwritten in tests/resources
+PATH_OUT = os.environ["PROJECT_ROOT"] + "/tests/loglike_models"
+
+
+def generate_reference(model):
+    """This function simulates a random model, evaluates its log-likelihood and
+    writes the model to the reference store."""
+    np.random.seed(model)
+    params, options = generate_random_model()
+
+    simulate_func = get_simulate_func(params, options)
+    df = simulate_func(params)
+
+    loglike_func = get_crit_func(params, options, df, return_comparison_plot_data=False)
+    loglike = loglike_func(params)
+
+    write_model(PATH_OUT, model, params["value"], options)
+
+    return loglike
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Generate log-likelihood references")
+    parser.add_argument(
+        "-m", "--models", type=int, default=200, help="number of models", dest="models"
+    )
+    parser.add_argument(
+        "-p", "--processes", type=int, default=os.cpu_count(), dest="processes"
+    )
+    args = parser.parse_args()
+
+    with mp.Pool(args.processes) as pool:
+        loglikes = pool.map(generate_reference, range(args.models), chunksize=1)
+
+    write_loglikes(PATH_OUT, pd.Series(loglikes))
@@ -1,23 +1,221 @@
 #!/usr/bin/env python
 """This module executes all notebooks. It serves the main purpose to ensure that all can be
-executed and work proper independently."""
+executed and work proper independently.
+
+Independent notebooks are executed in parallel by a limited number of workers. A notebook
+that consumes a file produced by another notebook is executed after it, see NOTEBOOK_FILES.
+Notebooks whose source and consumed files are unchanged since their last successful execution
+are skipped, unless --force is passed."""
+import fnmatch
 import glob
+import hashlib
+import json
 import os
 import subprocess as sp
+import sys
+import warnings
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
 
 from auxiliary import NOTEBOOKS_ROOT
-from auxiliary import parse_arguments
+from auxiliary import get_parser
+from auxiliary import get_request
+
+PROJECT_ROOT = os.environ["PROJECT_ROOT"]
+
+# Files consumed and produced by the notebooks as glob patterns relative to PROJECT_ROOT,
+# including the modules of the repository they import. A notebook is executed after all
+# notebooks that produce a file it consumes.
+NOTEBOOK_FILES = {
+    "01_comparative_statics_kw94.ipynb": {
+        "consumes": ["robustness/panel_store.py"],
+        "produces": [
+            "figures/fig_choice_patterns*.pdf",
+            "notebooks/panels/eta_*.npz",
+            "notebooks/effect_ambiguity_set",
+            "notebooks/df_EU",
+        ],
+    },
+    "02_check_run_robustness.ipynb": {
+        # Produced by robustness/run_robustness.py with SAVE.
+        "consumes": [
+            "robustness/panel_store.py",
+            "data/panels/eta_*.npz",
+            "data/df_EU.pkl",
+            "data/df_yoe_effect_ambiguity.pkl",
+        ],
+        "produces": [],
+    },
+    "99_tests_randommodels_ref_dfs.ipynb": {
+        "consumes": ["tests/reference_store.py"],
+        "produces": ["tests/loglike_models/*"],
+    },
+}
+
+# Hashes of the last successful execution of each notebook.
+CACHE_FILE = NOTEBOOKS_ROOT + "/.run_notebook.json"
 
 
 def run_notebook(notebook):
-    cmd = f" jupyter nbconvert --execute {notebook}  --ExecutePreprocessor.timeout=-1"
-    sp.check_call(cmd, shell=True)
+    cmd = [
+        "jupyter",
+        "nbconvert",
+        "--execute",
+        notebook,
+        "--ExecutePreprocessor.timeout=-1",
+    ]
+    sp.check_call(cmd, cwd=NOTEBOOKS_ROOT)
+
+
+def get_dependencies(notebooks):
+    """This function returns the notebooks that each notebook depends on, i.e. the ones that
+    produce a file it consumes. Notebooks that are not requested are not considered."""
+    dependencies = {}
+    for notebook in notebooks:
+        consumes = NOTEBOOK_FILES.get(notebook, {}).get("consumes", [])
+        dependencies[notebook] = {
+            producer
+            for producer in notebooks
+            if producer != notebook
+            and any(
+                fnmatch.fnmatch(consumed, produced)
+                or fnmatch.fnmatch(produced, consumed)
+                for consumed in consumes
+                for produced in NOTEBOOK_FILES.get(producer, {}).get("produces", [])
+            )
+        }
+
+    # A notebook must not depend on itself through other notebooks.
+    done, remaining = set(), set(notebooks)
+    while remaining:
+        ready = {notebook for notebook in remaining if dependencies[notebook] <= done}
+        if not ready:
+            raise AssertionError(f"cyclic dependencies between {sorted(remaining)}")
+        done |= ready
+        remaining -= ready
+
+    return dependencies
+
+
+def get_notebook_hash(notebook):
+    """This function hashes the source of the cells of a notebook, but not their outputs, and
+    the content of all files the notebook consumes. Consumed patterns without any file are
+    reported, as they cannot detect changes of the inputs."""
+    sha256 = hashlib.sha256()
+
+    with open(f"{NOTEBOOKS_ROOT}/{notebook}") as infile:
+        cells = json.load(infile)["cells"]
+    for cell in cells:
+        sha256.update(json.dumps([cell["cell_type"], cell["source"]]).encode())
+
+    for pattern in NOTEBOOK_FILES.get(notebook, {}).get("consumes", []):
+        sha256.update(pattern.encode())
+        fnames = sorted(glob.glob(f"{PROJECT_ROOT}/{pattern}"))
+        if not fnames:
+            warnings.warn(f"{notebook} consumes {pattern}, which matches no file.")
+        for fname in fnames:
+            sha256.update(os.path.relpath(fname, PROJECT_ROOT).encode())
+            with open(fname, "rb") as infile:
+                for chunk in iter(lambda: infile.read(1 << 20), b""):
+                    sha256.update(chunk)
+
+    return sha256.hexdigest()
+
+
+def load_cache():
+    if not os.path.exists(CACHE_FILE):
+        return {}
+
+    with open(CACHE_FILE) as infile:
+        return json.load(infile)
+
+
+def save_cache(cache):
+    # The cache is replaced atomically, such that an interrupted run does not corrupt it.
+    with open(CACHE_FILE + ".tmp", "w") as outfile:
+        json.dump(cache, outfile, indent=4, sort_keys=True)
+    os.replace(CACHE_FILE + ".tmp", CACHE_FILE)
+
+
+def run_notebooks(notebooks, num_workers=1, force=False):
+    """This function executes the notebooks in parallel with respect to their dependencies.
+
+    A notebook is skipped if its hash matches the one of its last successful execution. The
+    hash is computed when all notebooks it depends on are finished, such that their new
+    outputs are taken into account. The dependents of a failed notebook are not executed.
+
+    Returns:
+    --------
+    status: dict
+        Status of each notebook: "executed", "skipped", "failed" or "blocked".
+
+    """
+    dependencies = get_dependencies(notebooks)
+    cache = load_cache()
+
+    status, hashes, running = {}, {}, {}
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        while len(status) < len(notebooks):
+            for notebook in sorted(notebooks):
+                if notebook in status or notebook in running.values():
+                    continue
+
+                states = [
+                    status.get(dependency) for dependency in dependencies[notebook]
+                ]
+                if any(state in ["failed", "blocked"] for state in states):
+                    status[notebook] = "blocked"
+                    print(f"blocked  {notebook}")
+                elif all(state is not None for state in states):
+                    hashes[notebook] = get_notebook_hash(notebook)
+                    if not force and cache.get(notebook) == hashes[notebook]:
+                        status[notebook] = "skipped"
+                        print(f"skipped  {notebook}")
+                    else:
+                        running[executor.submit(run_notebook, notebook)] = notebook
+
+            if not running:
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                notebook = running.pop(future)
+                if future.exception() is None:
+                    status[notebook] = "executed"
+                    cache[notebook] = hashes[notebook]
+                    save_cache(cache)
+                else:
+                    status[notebook] = "failed"
+                    cache.pop(notebook, None)
+                    save_cache(cache)
+                print(f"{status[notebook]:<8} {notebook}")
+
+    return status
 
 
 if __name__ == "__main__":
 
-    request = parse_arguments("Execute notebook")
-    os.chdir(NOTEBOOKS_ROOT)
+    parser = get_parser("Execute notebook")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="maximum number of notebooks executed in parallel",
+        default=os.cpu_count(),
+        dest="jobs",
+    )
+    parser.add_argument(
+        "-f",
+        "--force",
+        action="store_true",
+        help="execute notebooks even if unchanged",
+        dest="force",
+    )
+    args = parser.parse_args()
+
+    status = run_notebooks(get_request(args.name), args.jobs, args.force)
 
-    for fname in glob.glob("*.ipynb"):
-        run_notebook(fname)
+    failed = [nb for nb, state in status.items() if state in ["failed", "blocked"]]
+    if failed:
+        sys.exit(f"unable to execute {sorted(failed)}")
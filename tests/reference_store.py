@@ -0,0 +1,109 @@
+"""Plain-text reference store for the log-likelihood values of random models.
+
+Each model is stored as numeric parameter table and options dictionary, such that
+a single model is loaded without deserializing all models and without pickle.
+
+    loglike.csv                 log-likelihood value of each model
+    model_{model}_params.csv    parameter values (category, name, value)
+    model_{model}_options.json  options dictionary
+"""
+import json
+from pathlib import Path
+
+import pandas as pd
+
+FLOAT_FORMAT = "%.17g"
+
+
+def get_model_paths(path, model):
+    """Paths of the parameters and options of a model."""
+    path = Path(path)
+    return (
+        path / f"model_{model:03d}_params.csv",
+        path / f"model_{model:03d}_options.json",
+    )
+
+
+def write_model(path, model, params, options):
+    """Write the parameters and options of a model.
+
+    Args:
+        path (str or Path): Directory of the reference store.
+
+        model (int): Identifier of the model.
+
+        params (pd.Series): Parameter values indexed by category and name.
+
+        options (dict): Options used in respy.
+
+    """
+    path_params, path_options = get_model_paths(path, model)
+    path_params.parent.mkdir(parents=True, exist_ok=True)
+
+    params.rename("value").to_csv(path_params, float_format=FLOAT_FORMAT, header=True)
+    json.dump(options, open(path_options, "w"), indent=4)
+
+
+def write_loglikes(path, loglikes):
+    """Write the log-likelihood values of all models.
+
+    Args:
+        path (str or Path): Directory of the reference store.
+
+        loglikes (pd.Series): Log-likelihood values indexed by model.
+
+    """
+    Path(path).mkdir(parents=True, exist_ok=True)
+
+    loglikes.rename("loglike").rename_axis("modelspec").to_csv(
+        Path(path) / "loglike.csv", float_format=FLOAT_FORMAT, header=True
+    )
+
+
+def load_loglikes(path):
+    """Load the log-likelihood values of all models as pd.Series."""
+    return pd.read_csv(
+        Path(path) / "loglike.csv", index_col="modelspec", float_precision="round_trip"
+    )["loglike"]
+
+
+def load_model(path, model):
+    """Load the parameters and options of a single model.
+
+    Returns:
+        params (pd.Series): Parameter values indexed by category and name.
+
+        options (dict): Options used in respy.
+
+    """
+    path_params, path_options = get_model_paths(path, model)
+
+    params = pd.read_csv(
+        path_params, index_col=["category", "name"], float_precision="round_trip"
+    )["value"]
+    options = json.load(open(path_options))
+
+    return params, options
+
+
+def convert_pickle_reference(path_pickle, path):
+    """Convert a reference data frame as created by ``99_tests_randommodels_ref_dfs``.
+
+    Args:
+        path_pickle (str or Path): Path of the pickled reference data frame.
+
+        path (str or Path): Directory of the reference store.
+
+    """
+    df_ll_ms = pd.read_pickle(path_pickle)
+    models = df_ll_ms.index.get_level_values("modelspec").unique()
+
+    loglikes = {}
+    for model in models:
+        options = df_ll_ms.loc[(model, "options", "options"), "value"]
+        params = pd.to_numeric(df_ll_ms.loc[model][:-2].iloc[:, 0])
+
+        write_model(path, model, params, options)
+        loglikes[model] = float(df_ll_ms.loc[(model, "loglike", "loglike"), "value"])
+
+    write_loglikes(path, pd.Series(loglikes))
@@ -1,4 +1,6 @@
 """Assert values log-likelihood function under ambiguity (speed-up)"""
+import hashlib
+import json
 import os
 from pathlib import Path
 
@@ -6,41 +8,68 @@ import numpy as np
 import pandas as pd
 import pytest
 import respy as rp
+from reference_store import load_loglikes
+from reference_store import load_model
 from respy.likelihood import get_crit_func
 from respy.simulate import get_simulate_func
 
-SUBDIR = Path(f"{os.environ['PROJECT_ROOT']}/tests/resources")
+SUBDIR = Path(f"{os.environ['PROJECT_ROOT']}/tests/resources/loglike_models")
 
+# Log-likelihood values of the random models in the reference data.
+LOGLIKES = load_loglikes(SUBDIR)
 
-def test_loglike_around_models():
+
+def get_simulated_data(params, options, cache):
+    """Simulate a model or load its simulated data from the pytest cache.
+
+    The data is cached by the hash of the model specification and the version of
+    respy, such that repeated runs only evaluate the likelihood. The data is
+    written to a temporary file first, such that parallel test processes never
+    read incomplete data.
+
+    """
+    model_hash = hashlib.sha256()
+    model_hash.update(rp.__version__.encode())
+    model_hash.update(params.to_csv().encode())
+    model_hash.update(json.dumps(options, sort_keys=True, default=str).encode())
+
+    path = cache.makedir("simulated_models") / f"{model_hash.hexdigest()}.pickle"
+
+    if path.exists():
+        df = pd.read_pickle(path)
+    else:
+        simulate_func = get_simulate_func(params, options)
+        df = simulate_func(params)
+
+        path_tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        df.to_pickle(path_tmp)
+        os.replace(path_tmp, path)
+
+    return df
+
+
+@pytest.mark.parametrize("model", LOGLIKES.index)
+def test_loglike_around_models(model, request):
     """Asserts likelihood values for randomly chosen model specifications.
 
     Ambiguity included in model specifications for i > (number_models/2).
     Reference data: no speed-up implementation, number_models = 200
 
     """
+    params, options = load_model(SUBDIR, model)
 
-    df_ll_ms = pd.read_pickle(f"{SUBDIR}/df_loglike_modelspecification.pickle")
-
-    for i in range(df_ll_ms.index[-1][0] + 1):
-        options = df_ll_ms.loc[(i, "options", "options"), "value"]
-        params = pd.to_numeric(df_ll_ms.loc[i][:-2].iloc[:, 0])
+    df = get_simulated_data(params, options, request.config.cache)
 
-        simulate_func = get_simulate_func(params, options)
-        df = simulate_func(params)
+    loglike_func = get_crit_func(params, options, df, return_comparison_plot_data=False)
+    loglike = loglike_func(params)
 
-        loglike_func = get_crit_func(
-            params, options, df, return_comparison_plot_data=False
-        )
-        loglike = loglike_func(params)
-
-        np.testing.assert_almost_equal(
-            loglike,
-            df_ll_ms.loc[(i, "loglike", "loglike"), "value"],
-            decimal=5,
-            err_msg="Assertion error log_like_values",
-            verbose=True,
-        )
+    np.testing.assert_almost_equal(
+        loglike,
+        LOGLIKES[model],
+        decimal=5,
+        err_msg="Assertion error log_like_values",
+        verbose=True,
+    )
 
 
 @pytest.mark.parametrize("ambiguity", [0.00, 0.02])
@@ -0,0 +1,108 @@
+"""Tests for the aggregation and the transfer of simulated models in the robustness analysis"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, f"{os.environ['PROJECT_ROOT']}/robustness")
+sys.path.insert(0, f"{os.environ['PROJECT_ROOT']}/python")
+
+import robustness_library  # noqa: E402
+from auxfunc_experiences import EXPERIENCE_COLUMNS  # noqa: E402
+from auxfunc_experiences import eval_mean_max_experiences  # noqa: E402
+from robustness_library import ChunkedSimulation  # noqa: E402
+
+VALUE_FUNC_COLUMNS = [
+    "Value_Function_A",
+    "Value_Function_B",
+    "Value_Function_Edu",
+    "Value_Function_Home",
+]
+
+
+def simulate_panel(options):
+    """Simulated panel of a KW94 model with random choices, experiences and values."""
+    np.random.seed(options["simulation_seed"])
+
+    num_agents, num_periods = options["simulation_agents"], options["n_periods"]
+    index = pd.MultiIndex.from_product(
+        [range(num_agents), range(num_periods)], names=["Identifier", "Period"]
+    )
+
+    df = pd.DataFrame(
+        {"Choice": np.random.choice(["a", "b", "edu", "home"], len(index))},
+        index=index,
+    )
+    for column in ["Experience_Edu", "Experience_B", "Experience_A"]:
+        increments = np.random.randint(0, 2, (num_agents, num_periods))
+        df[column] = increments.cumsum(axis=1).ravel()
+    for column in VALUE_FUNC_COLUMNS:
+        df[column] = np.random.normal(size=len(index))
+
+    return df
+
+
+def test_chunked_simulation_does_not_cache_chunks(monkeypatch):
+    options = {"simulation_agents": 10, "simulation_seed": 0, "n_periods": 5}
+
+    monkeypatch.setattr(
+        robustness_library,
+        "get_simulate_func",
+        lambda model, options: lambda params: simulate_panel(options),
+    )
+    monkeypatch.setattr(robustness_library, "SIMULATE_FUNCS", {})
+
+    aggregates = ChunkedSimulation("kw_94_two", options, chunk_size=2)(None)
+
+    assert robustness_library.SIMULATE_FUNCS == {}
+    assert aggregates["num_agents"] == 10
+    assert aggregates["choice_counts"].to_numpy().sum() == 50
+
+
+def test_shared_frame_is_mapped(monkeypatch, tmp_path):
+    df = simulate_panel({"simulation_agents": 10, "simulation_seed": 0, "n_periods": 5})
+    df.insert(1, "Wage", np.where(df["Choice"] == "home", np.nan, 1.0))
+    df["Choice"] = df["Choice"].astype("category")
+
+    mapped = []
+
+    def load(*args, **kwargs):
+        values = np.load.__wrapped__(*args, **kwargs)
+        if kwargs.get("mmap_mode") is not None:
+            mapped.append(values)
+        return values
+
+    load.__wrapped__ = np.load
+    monkeypatch.setattr(robustness_library.np, "load", load)
+
+    shared_frame = robustness_library.write_shared_frame(df, tmp_path)
+    df_shared = robustness_library.read_shared_frame(shared_frame)
+
+    pd.testing.assert_frame_equal(df_shared, df)
+
+    arrays = [np.asarray(codes) for codes in df_shared.index.codes]
+    for column in df_shared.columns:
+        values = df_shared[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            arrays.append(values.array.codes)
+        else:
+            arrays.append(values.to_numpy())
+
+    for values in arrays:
+        assert any(np.shares_memory(values, array) for array in mapped)
+
+
+@pytest.mark.parametrize("model", ["kw_94", "kw_97"])
+def test_mean_max_experiences_detects_model(model):
+    df = simulate_panel({"simulation_agents": 10, "simulation_seed": 0, "n_periods": 5})
+    experience_columns = list(EXPERIENCE_COLUMNS[model])
+    for column in experience_columns:
+        df[column] = df.groupby("Identifier").cumcount()
+    df = df.drop(columns=set(EXPERIENCE_COLUMNS["kw_94"]) - set(experience_columns))
+
+    df_exp = eval_mean_max_experiences({0.0: df, 0.1: df})
+
+    assert df_exp.columns.tolist() == experience_columns
+    np.testing.assert_array_equal(df_exp.to_numpy(), 4)
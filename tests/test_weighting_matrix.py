@@ -0,0 +1,48 @@
+"""Assert batched bootstrap weighting matrix for MSM against the bootstrap loop"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, f"{os.environ['PROJECT_ROOT']}/material")
+
+from _auxiliary_msm import calc_choice_frequencies  # noqa: E402
+from _auxiliary_msm import calc_wage_distribution  # noqa: E402
+from _auxiliary_msm import get_weighting_matrix  # noqa: E402
+from _auxiliary_msm import get_weighting_matrix_batched  # noqa: E402
+
+CALC_MOMENTS = {
+    "Choice Frequency": calc_choice_frequencies,
+    "Wage Distribution": calc_wage_distribution,
+}
+
+
+def get_panel(num_agents, num_periods, categorical):
+    """Panel with a rare choice, which is missing in some periods of a sample."""
+    np.random.seed(0)
+
+    index = pd.MultiIndex.from_product(
+        [range(num_agents), range(num_periods)], names=["Identifier", "Period"]
+    )
+    choices = np.random.choice(["a", "b", "home"], len(index), p=[0.5, 0.49, 0.01])
+    wages = np.where(choices == "home", np.nan, np.random.lognormal(10, 1, len(index)))
+
+    df = pd.DataFrame({"Choice": choices, "Wage": wages}, index=index)
+    if categorical:
+        df["Choice"] = pd.Categorical(df["Choice"], categories=["a", "b", "home"])
+
+    return df
+
+
+@pytest.mark.parametrize("categorical", [True, False])
+def test_weighting_matrix_batched(categorical):
+    df = get_panel(300, 10, categorical)
+
+    expected = get_weighting_matrix(df, CALC_MOMENTS, 50, 100)
+    weighting_matrix = get_weighting_matrix_batched(
+        df, CALC_MOMENTS, 50, 100, chunksize=20
+    )
+
+    np.testing.assert_allclose(weighting_matrix, expected, rtol=1e-8)